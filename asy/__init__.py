@@ -1,5 +1,14 @@
-from .tokens import CancelToken, PCancelToken
+from .tokens import CancelToken, PCancelToken, SharedCancelToken
 from . import protocols
 from .helpers import run, supervise, timeout
-from .exceptions import RestartAllException, AllCancelException
+from .exceptions import RestartAllException, AllCancelException, CircuitOpenError
 from . import components
+from .channel import Channel
+from .watchdog import Watchdog
+from .profiler import Profiler
+from .schedulable import ExecutorTask
+from .priority import Priority, prioritize
+from .breaker import CircuitBreaker
+from .journal import Journal, read_journal
+from .threaded import SupervisorThread
+from .budget import Budget
@@ -0,0 +1,91 @@
+import asyncio
+import inspect
+from typing import Any, Callable, Iterable, List, Union
+
+from .tokens import CancelToken
+
+
+class Batch:
+    """関数をイテラブルの各要素へ適用する子タスク。
+
+    関数の判定は一度だけ行い、要素毎にタスクやトークンを作らずに concurrency 個のワーカーで処理する。
+    イテラブルは必要な分だけ読み進め、全ての要素で子タスク自身のキャンセルトークンを共有する。
+    関数は `func(item)` または `func(item, token)` の形式で、同期関数も受け入れる。
+    イテレータは一度しか読み進められないため、再起動で作り直す場合はイテラブルを返す関数を渡す。
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        iterable: Union[Iterable, Callable[[], Iterable]],
+        concurrency: int = 100,
+        ordered: bool = True,
+    ):
+        # signature は束縛済みメソッドの self や partial で固定した引数を除いて返す
+        param_size = len(inspect.signature(func).parameters)
+        if param_size not in (1, 2):
+            raise RuntimeError(f"{func} must accept (item) or (item, token).")
+
+        self.func = func
+        self.iterable = iterable
+        self.concurrency = concurrency
+        self.ordered = ordered
+        self.consumed = False
+        self.takes_token = param_size == 2
+        call = getattr(func, "__call__", None)
+        self.is_async = inspect.iscoroutinefunction(func) or (
+            inspect.iscoroutinefunction(call)
+        )
+
+    def get_iterable(self) -> Iterable:
+        iterable = self.iterable
+        if callable(iterable):
+            return iterable()
+        if iter(iterable) is iterable:
+            if self.consumed:
+                raise RuntimeError(
+                    "The iterator of Batch has already been consumed. "
+                    "Pass a function returning the iterable to run it again."
+                )
+            self.consumed = True
+        return iterable
+
+    def __await__(self):
+        return self(CancelToken()).__await__()
+
+    async def __call__(self, token) -> List[Any]:
+        func = self.func
+        takes_token = self.takes_token
+        is_async = self.is_async
+        ordered = self.ordered
+        iterator = enumerate(self.get_iterable())
+        values: dict = {}
+        completed: list = []
+        errors: list = []
+
+        async def worker():
+            for index, item in iterator:
+                if token.is_cancelled or errors:
+                    break
+                try:
+                    value = func(item, token) if takes_token else func(item)
+                    if is_async:
+                        value = await value
+                    else:
+                        # 同期関数でもイベントループを占有しないよう、要素毎に実行を譲る
+                        await asyncio.sleep(0)
+                except Exception as e:  # pylint: disable=broad-except
+                    errors.append(e)
+                    break
+                if ordered:
+                    values[index] = value
+                else:
+                    completed.append(value)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+        if errors:
+            raise errors[0]
+        if ordered:
+            return [values[i] for i in range(len(values))]
+        return completed
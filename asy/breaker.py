@@ -0,0 +1,89 @@
+import asyncio
+import logging
+from typing import Tuple
+
+from .exceptions import AllCancelException, CircuitOpenError, RestartAllException
+from .normalizer import normalize_to_schedulable
+from .protocols import PCancelToken
+from .schedulable import new_task_name
+from .tokens import CancelToken
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """失敗した子タスクを再起動し、連続して失敗する場合は一定時間再起動を止めるサーキットブレーカー。
+
+    closed: 失敗すると即座に再起動する。連続した失敗が threshold 回に達すると open になる
+    open: cooldown 秒間は再起動しない。その後 half_open になる
+    half_open: 一度だけ再起動を試み、失敗すると再び open、成功すると closed になる
+
+    子タスクが正常に終了するとその結果を返す。open のままキャンセルされた場合は CircuitOpenError となる。
+    """
+
+    def __init__(self, func, threshold: int = 5, cooldown: float = 30.0):
+        self.schedulable = normalize_to_schedulable(func)
+        self.name = getattr(self.schedulable, "name", repr(func))
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
+        token = CancelToken()
+        task = asyncio.create_task(self(token), name=new_task_name(self.name))
+        return token, task
+
+    def snapshot(self):
+        return {"state": self.state, "failures": self.failures}
+
+    async def __call__(self, token):
+        while not token.is_cancelled:
+            if self.state == OPEN:
+                await self.wait_cooldown(token)
+                if token.is_cancelled:
+                    raise CircuitOpenError(self.name, self.failures)
+                self.state = HALF_OPEN
+
+            child_token, task = self.schedulable.schedule()
+            try:
+                while not task.done():
+                    await asyncio.wait([task], timeout=0.1)
+                    if token.is_cancelled:
+                        child_token.is_cancelled = True
+            finally:
+                if not task.done():
+                    task.cancel()
+
+            try:
+                result = task.result()
+            except (RestartAllException, AllCancelException, asyncio.CancelledError):
+                raise
+            except Exception as e:  # pylint: disable=broad-except
+                self.record_failure(e)
+                continue
+
+            self.state = CLOSED
+            self.failures = 0
+            return result
+
+    def record_failure(self, e: Exception):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.threshold:
+            self.state = OPEN
+            self.opened_at = asyncio.get_running_loop().time()
+            logger.warning(f"[CIRCUIT OPEN]{self.name} failures={self.failures} {e!r}")
+
+    async def wait_cooldown(self, token):
+        loop = asyncio.get_running_loop()
+        until = self.opened_at + self.cooldown
+        while not token.is_cancelled:
+            remaining = until - loop.time()
+            if remaining <= 0:
+                break
+            await asyncio.sleep(min(remaining, 0.1))
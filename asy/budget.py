@@ -0,0 +1,179 @@
+import asyncio
+import dis
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple, TypedDict
+
+from .exceptions import RestartAllException
+
+logger = logging.getLogger(__name__)
+
+ASY_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Usage(TypedDict):
+    name: str
+    cpu: float
+    memory: int
+    exceeded: str
+
+
+# 子タスクの関数の定義範囲（ファイル名、開始行、終了行）
+Scope = Tuple[str, int, int]
+
+
+def get_scope(task: asyncio.Task) -> Optional[Scope]:
+    """子タスクのコルーチンを辿り、asy 外で最初に見つかった関数の定義範囲を返す"""
+    coro: Any = task.get_coro()
+    while coro is not None:
+        code = getattr(coro, "cr_code", None)
+        if code is None:
+            break
+        if not code.co_filename.startswith(ASY_DIR):
+            lines = [x for _, x in dis.findlinestarts(code) if x is not None]
+            last = max(lines, default=code.co_firstlineno)
+            return code.co_filename, code.co_firstlineno, last
+        coro = coro.cr_await
+    return None
+
+
+def measure_memory(scopes: List[Scope]) -> Dict[Scope, int]:
+    """確保中のメモリを、確保した時点のスタックで最も内側にある子タスクの関数へ割り当てる。
+
+    子タスクから呼び出したライブラリ内での確保も、呼び出し元の子タスクに割り当てる。
+    どの子タスクの関数もスタックに見つからない確保は、いずれにも割り当てない。
+    """
+    by_file: Dict[str, List[Scope]] = {}
+    # 入れ子の関数は内側（範囲の狭い方）を優先する
+    for scope in sorted(set(scopes), key=lambda x: x[2] - x[1]):
+        by_file.setdefault(scope[0], []).append(scope)
+
+    sizes: Dict[Scope, int] = dict.fromkeys(scopes, 0)
+    snapshot = tracemalloc.take_snapshot()
+    for stat in snapshot.statistics("traceback"):
+        # フレームは古い順に並ぶため、確保した箇所から呼び出し元へ遡る
+        for frame in reversed(stat.traceback):
+            candidates = by_file.get(frame.filename)
+            if not candidates:
+                continue
+            lineno = frame.lineno
+            matched = next((x for x in candidates if x[1] <= lineno <= x[2]), None)
+            if matched:
+                sizes[matched] += stat.size
+                break
+    return sizes
+
+
+class Budget:
+    """子タスク毎のメモリとイベントループ占有率に上限を設け、超過した子タスクをキャンセルする。
+
+    占有率は別スレッドからイベントループで実行中のタスクをサンプリングして求める。
+    メモリは tracemalloc が記録したスタックを遡り、確保した子タスクの関数毎に集計する。
+    スタックは frames 段まで記録するため、より深い呼び出しでの確保は子タスクに割り当てられない。
+    同じ関数から作られた子タスクは区別できないため、メモリの超過ではキャンセルしない。
+    restart=True の場合、キャンセルの代わりに通常の再起動の経路で全ての子タスクを再起動する。
+    """
+
+    def __init__(
+        self,
+        memory: int = 0,
+        cpu: float = 0.0,
+        interval: float = 1.0,
+        sample_interval: float = 0.005,
+        restart: bool = False,
+        max_records: int = 100,
+        frames: int = 32,
+    ):
+        self.memory = memory
+        self.cpu = cpu
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.restart = restart
+        self.max_records = max_records
+        self.frames = frames
+        self.samples: Counter = Counter()
+
+    async def __call__(self, running, metrics, restart_callback):
+        loop = asyncio.get_running_loop()
+        stopped = threading.Event()
+        started_tracing = False
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            started_tracing = True
+
+        if self.cpu:
+            thread = threading.Thread(
+                target=self.sample,
+                args=(loop, stopped),
+                name="asy-budget",
+                daemon=True,
+            )
+            thread.start()
+
+        try:
+            while True:
+                since = time.monotonic()
+                await asyncio.sleep(self.interval)
+                elapsed = time.monotonic() - since
+                samples, self.samples = self.samples, Counter()
+                scopes = {task: get_scope(task) for task in list(running)}
+                sizes = (
+                    await loop.run_in_executor(
+                        None, measure_memory, [x for x in scopes.values() if x]
+                    )
+                    if self.memory
+                    else {}
+                )
+                if self.check(running, metrics, samples, scopes, sizes, elapsed):
+                    restart_callback(RestartAllException())
+                    return
+        finally:
+            stopped.set()
+            if started_tracing:
+                tracemalloc.stop()
+
+    def sample(self, loop, stopped: threading.Event):
+        interval = self.sample_interval
+        while not stopped.wait(interval):
+            task = asyncio.current_task(loop)
+            if task is not None:
+                self.samples[task] += 1
+
+    def check(self, running, metrics, samples, scopes, sizes, elapsed) -> bool:
+        """上限を超過した子タスクをキャンセルし、直近の超過を子タスク毎に max_records 件まで記録する。再起動が必要な場合は True を返す"""
+        usages = metrics.budgets
+        shared = Counter(scopes.values())
+
+        for task, token in list(running.items()):
+            if task.done():
+                continue
+
+            cpu = samples.get(task, 0) * self.sample_interval / elapsed
+            scope = scopes.get(task)
+            # 同じ関数の子タスク同士はメモリを区別できない
+            memory = sizes.get(scope, 0) if scope and shared[scope] == 1 else 0
+
+            if self.memory and memory > self.memory:
+                exceeded = "memory"
+            elif self.cpu and cpu > self.cpu:
+                exceeded = "cpu"
+            else:
+                continue
+
+            name = task.get_name()
+            usages[name] = Usage(name=name, cpu=cpu, memory=memory, exceeded=exceeded)
+            # 子タスクの名前は起動毎に異なるため、古い記録から捨てる
+            while len(usages) > self.max_records:
+                del usages[next(iter(usages))]
+            logger.warning(f"[BUDGET]{name} exceeded {exceeded} budget: {usages[name]}")
+
+            if self.restart:
+                return True
+            token.is_cancelled = True
+
+        return False
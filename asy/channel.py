@@ -0,0 +1,92 @@
+import asyncio
+from collections import deque
+from typing import Any, Deque, Optional
+
+
+class ChannelClosed(Exception):
+    pass
+
+
+class Channel:
+    """子タスクが生成した値を受け渡す有界のチャネル。
+
+    満杯の場合、送信側は空きができるまで待機する（背圧）。閉じられたチャネルは、残りの値を受け取り終えると反復を終了する。
+    """
+
+    def __init__(self, maxsize: int = 100):
+        self.maxsize = maxsize
+        self.items: Deque[Any] = deque()
+        self.closed = False
+        self._getters: Deque[asyncio.Future] = deque()
+        self._putters: Deque[asyncio.Future] = deque()
+
+    def __len__(self):
+        return len(self.items)
+
+    def open(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+        self._wakeup_all(self._getters)
+        self._wakeup_all(self._putters)
+
+    async def put(self, item, token=None) -> bool:
+        """値を送る。token を渡した場合、空きを待つ間にキャンセルされると送らずに False を返す"""
+        # トークンには待機の仕組みが無いため、キャンセルを監視する間隔で待機を打ち切る
+        timeout = None if token is None else 0.1
+        while len(self.items) >= self.maxsize and not self.closed:
+            if token is not None and token.is_cancelled:
+                return False
+            await self._wait(self._putters, timeout)
+        if self.closed:
+            raise ChannelClosed()
+        self.items.append(item)
+        self._wakeup(self._getters)
+        return True
+
+    async def get(self):
+        while not self.items:
+            if self.closed:
+                raise ChannelClosed()
+            await self._wait(self._getters)
+        item = self.items.popleft()
+        self._wakeup(self._putters)
+        return item
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.get()
+        except ChannelClosed:
+            raise StopAsyncIteration()
+
+    @staticmethod
+    async def _wait(waiters: Deque[asyncio.Future], timeout: Optional[float] = None):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            if timeout is None:
+                await waiter
+            else:
+                await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            if not waiter.done():
+                waiters.remove(waiter)
+
+    @staticmethod
+    def _wakeup(waiters: Deque[asyncio.Future]):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    @staticmethod
+    def _wakeup_all(waiters: Deque[asyncio.Future]):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
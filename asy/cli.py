@@ -1,15 +1,36 @@
+import asyncio
+import inspect
 import typer
-from typing import List
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-from asy.components import FileWatcher
+from asy.components import FileWatcher, HealthServer
+from asy.components.filewatcher import raise_restart_if_file_changed
+from asy.exceptions import RestartAllException
+from asy.metrics import Metrics
+from asy.watchdog import Watchdog
 
 app = typer.Typer()
+logger = logging.getLogger(__name__)
 
 
 class Reloader:
-    def __init__(self, attrs):
-        # 指定内容が正しいか一度検証する
-        package_modules = {get_package_and_module(x) for x in attrs}
+    def __init__(
+        self,
+        attrs,
+        rolling=False,
+        reload_dirs=["."],
+        interval=1.0,
+        health_grace=1.0,
+        journal=None,
+        parallel_import=True,
+        watchdog=None,
+    ):
+        # 指定内容が正しいか一度検証し、解決した関数は最初の世代で再利用する
+        self.parallel_import = parallel_import
+        targets, imported = import_attrs(attrs, parallel_import)
+        self.targets: Optional[List[Any]] = targets
+        package_modules = {(x.__package__, x.__name__) for x in imported.values()}
         packages = {x[0] for x in package_modules}
         modules = {x[1] for x in package_modules}
 
@@ -34,22 +55,104 @@ class Reloader:
         self.attrs = attrs
         self.packages = packages
         self.modules = modules
+        self.rolling = rolling
+        self.reload_dirs = reload_dirs
+        self.interval = interval
+        self.health_grace = health_grace
+        self.journal = journal
+        # 停滞は監視せず、各世代のイベントループの遅延のみを計測する
+        self.watchdog = watchdog or Watchdog(threshold=0.0)
+        self.current = None
+        self.idle_metrics = Metrics()
+
+    @property
+    def metrics(self):
+        """稼働中の世代の指標"""
+        current = self.current
+        return current.metrics if current else self.idle_metrics
+
+    def new_supervisor(self, callables):
+        """世代のスーパーバイザーを作成する。
+
+        再起動回数は前の世代から引き継ぎ、世代を跨いで数える。
+        """
+        import asy
+
+        supervisor = asy.supervise(*callables)
+        supervisor.set_config(journal=self.journal, watchdog=self.watchdog)
+        if self.current:
+            supervisor.metrics.restarts = self.current.metrics.restarts + 1
+        return supervisor
 
     def clear_import(self):
+        self.targets = None
         [clear_cache(x) for x in self.packages]
         [clear_cache(x) for x in self.modules]
 
+    def resolve(self):
+        """解決済みの関数を返す。インポートのキャッシュをクリアした後は改めて解決する"""
+        if self.targets is None:
+            self.targets = resolve_attrs(self.attrs, self.parallel_import)
+        return self.targets
+
     async def __call__(self, token):
-        import asy
+        if self.rolling:
+            return await self.roll(token)
 
-        callables = [get_module_attr_from_str(x) for x in self.attrs]
-        supervisor = asy.supervise(*callables)
+        callables = self.resolve()
+        await warmup(callables)
+        supervisor = self.new_supervisor(callables)
+        self.current = supervisor
         await supervisor(token)
         self.clear_import()
 
+    async def roll(self, token):
+        """ファイルの変更を検知すると新しい世代を起動し、正常に稼働してから古い世代を停止する。
+
+        新しい世代のインポートや起動に失敗した場合は、古い世代を稼働させ続ける。
+        """
+        current = self.current = await self.next_generation(None)
+        mtimes: dict = {}
+
+        try:
+            while not token.is_cancelled:
+                await asyncio.sleep(self.interval)
+                try:
+                    mtimes = raise_restart_if_file_changed(mtimes, self.reload_dirs)
+                except RestartAllException as e:
+                    logger.info(f"[RELOAD]{e}")
+                    mtimes = {}
+                    current = self.current = await self.next_generation(current)
+        finally:
+            if current:
+                await current.stop()
+
+    async def next_generation(self, current):
+        if current:
+            self.clear_import()
+        try:
+            callables = self.resolve()
+            await warmup(callables)
+            supervisor = self.new_supervisor(callables)
+        except Exception:
+            logger.exception("[RELOAD]failed to import. keep current generation.")
+            return current
+
+        await supervisor.start()
+        await asyncio.sleep(self.health_grace)
+
+        if supervisor.metrics.failed:
+            logger.error("[RELOAD]new generation failed. keep current generation.")
+            await supervisor.stop()
+            return current
+
+        if current:
+            await current.stop()
+        return supervisor
+
     @classmethod
-    def from_functions(cls, *attrs):
-        return cls(attrs=attrs)
+    def from_functions(cls, *attrs, **kwargs):
+        return cls(attrs=attrs, **kwargs)
 
     @classmethod
     def from_class(cls, target, **kwargs):
@@ -57,26 +160,73 @@ class Reloader:
 
 
 @app.command()
-def run(attrs: List[str], reload: bool = False, log: str = "INFO"):
+def run(
+    attrs: List[str],
+    reload: bool = False,
+    log: str = "INFO",
+    profile: str = "",
+    workers: int = 1,
+    preload: bool = False,
+    rolling: bool = False,
+    health: str = "",
+    journal: str = "",
+    serial_import: bool = typer.Option(
+        False,
+        help=(
+            "Import modules one by one. With threaded import, a module failing "
+            "partway (e.g. main-thread-only calls) is imported again serially, "
+            "so its import-time side effects run twice."
+        ),
+    ),
+):
     import asy
 
     logging.basicConfig(level=log)
 
-    sub = []
+    if workers > 1:
+        from asy.prefork import Prefork
+
+        if reload:
+            raise typer.BadParameter("--workers can not be used with --reload.")
 
-    if reload:
+        Prefork(attrs, workers=workers, preload=preload, profile=profile).run()
+        return
+
+    sub: List[Any] = []
+
+    if reload and not rolling:
         sub.append(FileWatcher(["."]))
 
-    reloader = Reloader.from_functions(*attrs)
-    asy.supervise(reloader, *sub).run()
+    # 利用者の子タスクを記録するため、ジャーナルは各世代のスーパーバイザーに渡す
+    event_journal = asy.Journal(journal) if journal else None
+    reloader = Reloader.from_functions(
+        *attrs,
+        rolling=reload and rolling,
+        journal=event_journal,
+        parallel_import=not serial_import,
+    )
 
+    if health.startswith("unix:"):
+        sub.append(HealthServer(reloader, path=health[len("unix:") :]))
+    elif health:
+        host, port = health.rsplit(":", 1)
+        sub.append(HealthServer(reloader, host=host, port=int(port)))
 
-def get_module(attr_path: str):
-    from importlib import import_module
+    supervisor = asy.supervise(reloader, *sub)
+    supervisor.set_config(profiler=asy.Profiler(profile) if profile else None)
+
+    try:
+        supervisor.run()
+    finally:
+        if event_journal:
+            event_journal.close()
 
-    module, attr = attr_path.split(":")
-    imported_module = import_module(module)
-    return imported_module
+
+@app.command("journal")
+def show_journal(path: str):
+    from asy.journal import read_journal
+
+    read_journal(path).print()
 
 
 def clear_cache(package):
@@ -92,8 +242,7 @@ def enumrate_members(module_name):
     import sys
 
     module = sys.modules[module_name]
-    attrs = [getattr(module, attribute) for attribute in dir(module)]
-    for attr in attrs:
+    for attr in list(vars(module).values()):
         package = getattr(attr, "__package__", "")
         module = getattr(attr, "__module__", "")
 
@@ -103,16 +252,53 @@ def enumrate_members(module_name):
         yield package, module
 
 
-def get_package_and_module(attr_path: str):
-    module = get_module(attr_path)
-    return module.__package__, module.__name__
-
+def import_modules(names, parallel: bool = True) -> Dict[str, ModuleType]:
+    """モジュールをそれぞれ一度だけインポートする。
 
-def get_module_attr_from_str(attr_path: str):
+    parallel=True の場合、未インポートのモジュールをスレッドプールで並行してインポートする。
+    インポートはモジュール毎のロックで保護されるため、独立したモジュールは並行して読み込める。
+    メインスレッドでのみ動作する処理（signal.signal 等）で失敗したモジュールは、改めて直列にインポートする。
+    その場合、失敗するまでに実行されたモジュールの処理は二度実行される。
+    """
     import sys
+    from concurrent.futures import ThreadPoolExecutor
     from importlib import import_module
 
-    module, attr = attr_path.split(":")
-    imported_module = import_module(module)
-    instance = getattr(imported_module, attr)
-    return instance
+    names = list(dict.fromkeys(names))
+    pending = [x for x in names if x not in sys.modules]
+    if parallel and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(pending), 8)) as executor:
+            futures = {x: executor.submit(import_module, x) for x in pending}
+        failed = [x for x, future in futures.items() if future.exception()]
+        if failed:
+            logger.warning(f"[IMPORT]failed in threads. retry serially: {failed}")
+
+    # 失敗したモジュールは sys.modules に残らないため、ここで改めてインポートされる
+    return {x: import_module(x) for x in names}
+
+
+def import_attrs(
+    attrs, parallel: bool = True
+) -> Tuple[List[Any], Dict[str, ModuleType]]:
+    """`module:attr` 形式の指定を解決し、解決した属性とインポートしたモジュールを返す"""
+    paths = [x.split(":") for x in attrs]
+    modules = import_modules((module for module, attr in paths), parallel)
+    return [getattr(modules[module], attr) for module, attr in paths], modules
+
+
+def resolve_attrs(attrs, parallel: bool = True) -> List[Any]:
+    """`module:attr` 形式の指定を解決する。モジュールはそれぞれ一度だけインポートする"""
+    return import_attrs(attrs, parallel)[0]
+
+
+async def warmup(targets):
+    """ターゲットが `__asy_warmup__` を持つ場合、スーパーバイザーを起動する前に並行して実行する"""
+    awaitables = []
+    for target in targets:
+        hook = getattr(target, "__asy_warmup__", None)
+        if hook is None:
+            continue
+        result = hook()
+        if inspect.isawaitable(result):
+            awaitables.append(result)
+    await asyncio.gather(*awaitables)
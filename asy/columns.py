@@ -0,0 +1,140 @@
+import json
+import os
+import sys
+from array import array
+from typing import Any, Dict, Sequence
+
+STATES = ("succeed", "failed", "cancelled", "pending")
+STATE_CODES = {x: i for i, x in enumerate(STATES)}
+
+# 列名と形式。1文字の形式は array の型コードを表し、値をそのままバイト列として書き出す
+COLUMNS = {
+    "name": "text",
+    "state": "b",
+    "exception": "json",
+    "started": "d",
+    "duration": "d",
+    "restarts": "q",
+}
+
+
+def new_columns() -> Dict[str, Any]:
+    return {k: [] if len(v) > 1 else array(v) for k, v in COLUMNS.items()}
+
+
+def count_states(states: array) -> Dict[str, int]:
+    """状態コードの配列を状態毎に数える"""
+    return {x: states.count(i) for i, x in enumerate(STATES)}
+
+
+def failure_rate(states: array) -> float:
+    return states.count(STATE_CODES["failed"]) / len(states) if states else 0.0
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """整列済みの値から、線形補間でパーセンタイル（0〜100）を求める"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] * (1 - fraction) + sorted_values[upper] * fraction
+
+
+class ColumnWriter:
+    """Resultを列毎のファイルへ追記する。
+
+    行の辞書を保持せず、batch_size 件毎に列の配列をファイルへ書き出すため、大量の子タスクの結果を一定のメモリで書き出せる。
+    閉じる際に、件数と列の形式を schema.json へ書き出す。
+    """
+
+    def __init__(self, path, batch_size: int = 10000):
+        self.path = str(path)
+        self.batch_size = batch_size
+        self.count = 0
+        self.columns = new_columns()
+        os.makedirs(self.path, exist_ok=True)
+        for name in COLUMNS:
+            open(self.get_filename(name), "wb").close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def get_filename(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.{COLUMNS[name]}")
+
+    def write(self, result):
+        columns = self.columns
+        columns["name"].append(result["name"])
+        columns["state"].append(STATE_CODES[result["state"]])
+        columns["exception"].append(result["exception"])
+        columns["started"].append(result["started"])
+        columns["duration"].append(result["duration"])
+        columns["restarts"].append(result["restarts"])
+        self.count += 1
+        if len(columns["state"]) >= self.batch_size:
+            self.flush()
+
+    def write_task(self, task):
+        """完了したタスクを書き出す。スーパーバイザーの on_completed に渡して逐次書き出せる。
+
+        on_completed には時刻が渡されないため、時刻も書き出す場合は Retention(sink=writer.write) を用いる。
+        """
+        from .results import Result
+
+        self.write(Result.from_task(task, drop_payload=True))
+
+    def flush(self):
+        for name, kind in COLUMNS.items():
+            values = self.columns[name]
+            if not values:
+                continue
+            with open(self.get_filename(name), "ab") as f:
+                if kind == "text":
+                    f.write("".join(f"{x}\n" for x in values).encode())
+                elif kind == "json":
+                    f.write("".join(f"{json.dumps(x)}\n" for x in values).encode())
+                else:
+                    values.tofile(f)
+        self.columns = new_columns()
+
+    def close(self):
+        self.flush()
+        schema = {
+            "count": self.count,
+            "states": STATES,
+            "byteorder": sys.byteorder,
+            "columns": COLUMNS,
+        }
+        with open(os.path.join(self.path, "schema.json"), "w") as f:
+            json.dump(schema, f)
+
+
+def read_columns(path) -> Dict[str, Any]:
+    """ColumnWriter が書き出した列を読み込む"""
+    path = str(path)
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+
+    count = schema["count"]
+    columns: Dict[str, Any] = {}
+    for name, kind in schema["columns"].items():
+        filename = os.path.join(path, f"{name}.{kind}")
+        if kind == "text":
+            with open(filename) as f:
+                columns[name] = f.read().splitlines()
+        elif kind == "json":
+            with open(filename) as f:
+                columns[name] = [json.loads(x) for x in f]
+        else:
+            values = array(kind)
+            with open(filename, "rb") as f:
+                values.fromfile(f, count)
+            if schema["byteorder"] != sys.byteorder:
+                values.byteswap()
+            columns[name] = values
+    return columns
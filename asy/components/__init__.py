@@ -1,4 +1,17 @@
+from .cache import Memoize, memoize
 from .filewatcher import FileWatcher
+from .health import HealthServer
+from .micro import MicroWorkers
+from .process import Subprocess
+from .state import StateStore
 
 
-__all__ = ["FileWatcher"]
+__all__ = [
+    "FileWatcher",
+    "HealthServer",
+    "Memoize",
+    "MicroWorkers",
+    "StateStore",
+    "Subprocess",
+    "memoize",
+]
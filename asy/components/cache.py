@@ -0,0 +1,129 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+KWARGS_MARK = object()
+
+
+def make_key(args, kwargs) -> Hashable:
+    if not kwargs:
+        return args
+    return args + (KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+class Memoize:
+    """非同期関数の結果を LRU・TTL で保持する。
+
+    同じ引数での同時呼び出しは一つの計算にまとめ、全ての呼び出し元がその結果を待つ。
+    計算は呼び出し元のキャンセルから保護されるため、ある呼び出し元がキャンセルしても他の呼び出し元の計算は継続する。
+    例外は結果として保持しない。
+    メソッドに用いた場合はインスタンスを第一引数としてキーに含めるため、キャッシュはインスタンスを参照し続ける。
+    """
+
+    def __init__(self, func, maxsize: Optional[int] = 128, ttl: float = 0.0):
+        self.func = func
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.cache: OrderedDict = OrderedDict()
+        self.inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        functools.update_wrapper(self, func)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return BoundMemoize(self, instance)
+
+    async def __call__(self, *args, **kwargs):
+        hit, value = self.lookup(args, kwargs)
+        if hit:
+            return value
+        return await asyncio.shield(value)
+
+    async def call(self, token, *args, **kwargs):
+        """キャンセルトークンを監視しながら結果を待つ。トークンがキャンセルされた場合、この呼び出し元のみが CancelledError で待機を終える。"""
+        hit, future = self.lookup(args, kwargs)
+        if hit:
+            return future
+
+        while not future.done():
+            if token.is_cancelled:
+                raise asyncio.CancelledError()
+            await asyncio.wait([future], timeout=0.1)
+        return future.result()
+
+    def lookup(self, args, kwargs) -> Tuple[bool, Any]:
+        """保持している結果があれば (True, 結果) を、なければ (False, 計算中のフューチャー) を返す"""
+        key = make_key(args, kwargs)
+        cache = self.cache
+
+        if key in cache:
+            expires, value = cache[key]
+            if not expires or expires > time.monotonic():
+                cache.move_to_end(key)
+                self.hits += 1
+                return True, value
+            del cache[key]
+
+        self.misses += 1
+        future = self.inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.func(*args, **kwargs))
+            future.add_done_callback(functools.partial(self.on_done, key))
+            self.inflight[key] = future
+        return False, future
+
+    def on_done(self, key, future: asyncio.Future):
+        del self.inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        cache = self.cache
+        cache[key] = (expires, future.result())
+        cache.move_to_end(key)
+        if self.maxsize is not None and len(cache) > self.maxsize:
+            cache.popitem(last=False)
+
+    def cache_clear(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self.cache),
+            "inflight": len(self.inflight),
+            "maxsize": self.maxsize,
+        }
+
+
+class BoundMemoize:
+    """インスタンスに束縛した Memoize。キャッシュは束縛元の Memoize と共有する"""
+
+    def __init__(self, memoize: Memoize, instance):
+        self.memoize = memoize
+        self.instance = instance
+
+    def __call__(self, *args, **kwargs):
+        return self.memoize(self.instance, *args, **kwargs)
+
+    def call(self, token, *args, **kwargs):
+        return self.memoize.call(token, self.instance, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self.memoize, name)
+
+
+def memoize(maxsize: Optional[int] = 128, ttl: float = 0.0):
+    """非同期関数を Memoize で包むデコレータ"""
+
+    def wrapper(func) -> Memoize:
+        return Memoize(func, maxsize=maxsize, ttl=ttl)
+
+    return wrapper
@@ -0,0 +1,67 @@
+import asyncio
+import json
+from http import HTTPStatus
+
+
+class HealthServer:
+    """監督対象の状態をHTTPで返す軽量なエンドポイント。
+
+    `target.metrics` の逐次更新された値のみを返すため、子タスクが多数でも一回の問い合わせのコストは変わらない。
+    path を指定した場合はTCPの代わりにUnixドメインソケットで待ち受ける。
+
+    GET /health: 常に200と指標を返す
+    GET /ready: 準備完了なら200、そうでなければ503を返す
+    """
+
+    def __init__(self, target, host: str = "127.0.0.1", port: int = 8000, path=None):
+        self.target = target
+        self.host = host
+        self.port = port
+        self.path = path
+
+    async def __call__(self, token):
+        if self.path:
+            server = await asyncio.start_unix_server(self.handle, path=self.path)
+        else:
+            server = await asyncio.start_server(self.handle, self.host, self.port)
+
+        try:
+            while not token.is_cancelled:
+                await asyncio.sleep(0.1)
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    async def handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                ...
+
+            parts = request_line.split()
+            target = parts[1] if len(parts) > 1 else b"/"
+            metrics = self.target.metrics
+
+            if target == b"/health":
+                status = HTTPStatus.OK
+            elif target == b"/ready" and metrics.ready:
+                status = HTTPStatus.OK
+            elif target == b"/ready":
+                status = HTTPStatus.SERVICE_UNAVAILABLE
+            else:
+                status = HTTPStatus.NOT_FOUND
+
+            body = b""
+            if status != HTTPStatus.NOT_FOUND:
+                body = json.dumps(metrics.snapshot()).encode()
+            writer.write(
+                b"HTTP/1.0 %d %s\r\n"
+                b"Content-Type: application/json\r\n"
+                b"Content-Length: %d\r\n"
+                b"Connection: close\r\n\r\n"
+                % (status.value, status.phrase.encode(), len(body))
+            )
+            writer.write(body)
+            await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,110 @@
+import asyncio
+import itertools
+import logging
+from types import GeneratorType
+from typing import Any, Callable, Dict, Iterable, List, Union
+
+logger = logging.getLogger(__name__)
+
+
+class MicroWorkers:
+    """多数の軽量なワーカーを、少数のドライバータスクでラウンドロビンに実行する子タスク。
+
+    ワーカー毎にタスクやキャンセルトークンを作らないため、
+    `while not token.is_cancelled` の小さなループを大量に動かす場合に比べメモリを大きく削減できる。
+    ワーカーはジェネレータ（一度の next が一ステップ。StopIteration で終了）、
+    またはステップ関数（False を返すと終了）を受け入れる。
+    キャンセルにより残ったジェネレータは close() する。
+    ワーカーは一度しか実行できないため、再起動で作り直す場合はワーカーを返す関数を渡す。
+    キャンセルの確認は、ドライバー毎に全てのワーカーを一巡する度に一度だけ行う。
+    ステップで例外を送出したワーカーは記録して取り除き、他のワーカーは継続する。
+    """
+
+    def __init__(
+        self,
+        workers: Union[Iterable, Callable[[], Iterable]],
+        drivers: int = 4,
+        interval: float = 0.0,
+        yield_every: int = 1000,
+        max_errors: int = 10,
+    ):
+        self.workers = workers
+        self.drivers = drivers
+        self.interval = interval
+        self.yield_every = yield_every
+        self.max_errors = max_errors
+        self.consumed = False
+        self.finished = 0
+        self.failed = 0
+        self.errors: List[Exception] = []
+
+    def get_workers(self) -> Iterable:
+        if callable(self.workers):
+            return self.workers()
+        if self.consumed:
+            raise RuntimeError(
+                "MicroWorkers can only run its workers once. "
+                "Pass a function returning the workers to run them again."
+            )
+        self.consumed = True
+        return self.workers
+
+    async def __call__(self, token) -> Dict[str, Any]:
+        workers = self.get_workers()
+        self.finished = 0
+        self.failed = 0
+        self.errors = []
+
+        drivers = self.drivers
+        lanes: List[List] = [[] for _ in range(drivers)]
+        for i, worker in enumerate(workers):
+            lanes[i % drivers].append(worker)
+
+        remaining = await asyncio.gather(*(self.drive(x, token) for x in lanes))
+        return {
+            "finished": self.finished,
+            "failed": self.failed,
+            "remaining": sum(remaining),
+        }
+
+    async def drive(self, steps: List, token) -> int:
+        interval = self.interval
+        yield_every = self.yield_every
+        alive: List = []
+
+        try:
+            while steps and not token.is_cancelled:
+                alive = []
+                for i, step in enumerate(steps, 1):
+                    try:
+                        if isinstance(step, GeneratorType):
+                            # ジェネレータが生成した値（False を含む）は終了の判定に用いない
+                            next(step)
+                            alive.append(step)
+                        elif step() is not False:
+                            alive.append(step)
+                        else:
+                            self.finished += 1
+                    except StopIteration:
+                        self.finished += 1
+                    except Exception as e:  # pylint: disable=broad-except
+                        self.on_error(e)
+
+                    if not i % yield_every:
+                        await asyncio.sleep(0)
+
+                steps, alive = alive, []
+                await asyncio.sleep(interval)
+        finally:
+            # 一巡の途中で中断された場合、未処理のワーカーと処理済みのワーカーが分かれている
+            for step in itertools.chain(steps, alive):
+                if isinstance(step, GeneratorType):
+                    step.close()
+
+        return len(steps)
+
+    def on_error(self, e: Exception):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(e)
+        logger.warning(f"[MICRO]worker failed: {e!r}")
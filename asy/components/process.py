@@ -0,0 +1,95 @@
+import asyncio
+import logging
+import os
+import signal
+from typing import Callable, Optional
+
+from asy.exceptions import ProcessExitError, RestartAllException
+
+logger = logging.getLogger(__name__)
+
+
+class Subprocess:
+    """外部プロセスを子タスクとして監督する。
+
+    キャンセルされるとSIGTERMを送り、猶予時間（grace）を過ぎても終了しなければSIGKILLを送る。
+    標準出力・標準エラーは一行ずつコールバックへ渡され、バッファに溜め込まない。
+    """
+
+    def __init__(
+        self,
+        *args: str,
+        grace: float = 10.0,
+        on_stdout: Optional[Callable[[str], None]] = None,
+        on_stderr: Optional[Callable[[str], None]] = None,
+        restart_on_exit: bool = False,
+        **kwargs,
+    ):
+        self.args = args
+        self.name = os.path.basename(args[0])
+        self.grace = grace
+        self.on_stdout = on_stdout or self.log
+        self.on_stderr = on_stderr or self.log
+        self.restart_on_exit = restart_on_exit
+        self.kwargs = kwargs
+
+    def log(self, line: str):
+        logger.info("[%s]%s", self.name, line)
+
+    async def __call__(self, token):
+        proc = await asyncio.create_subprocess_exec(
+            *self.args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **self.kwargs,
+        )
+        assert proc.stdout and proc.stderr
+        readers = [
+            asyncio.create_task(self.read_lines(proc.stdout, self.on_stdout)),
+            asyncio.create_task(self.read_lines(proc.stderr, self.on_stderr)),
+        ]
+        wait = asyncio.create_task(proc.wait())
+        terminated = False
+
+        try:
+            while not wait.done():
+                await asyncio.wait([wait], timeout=0.1)
+                if token.is_cancelled and not wait.done():
+                    terminated = True
+                    await self.terminate(proc, wait)
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await wait
+            await asyncio.gather(*readers)
+
+        returncode = proc.returncode
+        if terminated:
+            return returncode
+        if self.restart_on_exit:
+            raise RestartAllException(f"{self.name} exited with code {returncode}")
+        assert returncode is not None
+        if returncode != 0:
+            raise ProcessExitError(self.args, returncode)
+        return returncode
+
+    async def terminate(self, proc, wait):
+        proc.send_signal(signal.SIGTERM)
+        done, pending = await asyncio.wait([wait], timeout=self.grace)
+        if pending:
+            logger.warning(f"[{self.name}]not terminated in {self.grace}s. killed.")
+            proc.kill()
+            await wait
+
+    @staticmethod
+    async def read_lines(stream: asyncio.StreamReader, callback):
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # 上限（StreamReaderのlimit）を超える長さの行はバッファせずに破棄する
+                logger.warning("too long line was discarded.")
+                continue
+            if not line:
+                break
+            callback(line.decode(errors="replace").rstrip("\n"))
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import pickle
+from typing import Any, Dict, Iterator, MutableMapping
+
+
+class StateStore(MutableMapping[str, Any]):
+    """子タスクの進捗（カーソル等）を保持するファイルバックエンドのストア。
+
+    再起動（RestartAllException やプロセスの再起動）後も、前回スナップショットした状態から再開できる。
+    スーパーバイザーの子として登録すると、一定間隔とキャンセル時にスナップショットを取る。
+    """
+
+    def __init__(self, path, interval: float = 1.0):
+        self.path = str(path)
+        self.interval = interval
+        self.data: Dict[str, Any] = self.load(self.path)
+        self.dirty = False
+
+    @staticmethod
+    def load(path: str) -> Dict[str, Any]:
+        try:
+            with open(path, "rb") as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return {}
+        return pickle.loads(payload) if payload else {}
+
+    def snapshot(self):
+        """一時ファイルに書き出してから置き換えるため、書き込み途中の状態が読まれることはない。"""
+        if not self.dirty:
+            return
+
+        self.write(self.dump())
+        self.dirty = False
+
+    async def save(self):
+        """イベントループ上で直列化し、ファイルへの書き込みと fsync はエクゼキューターで行う"""
+        if not self.dirty:
+            return
+
+        payload = self.dump()
+        self.dirty = False
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.write, payload)
+        except BaseException:
+            self.dirty = True
+            raise
+
+    def dump(self) -> bytes:
+        return pickle.dumps(self.data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(self, payload: bytes):
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    async def __call__(self, token):
+        interval = self.interval
+
+        try:
+            while not token.is_cancelled:
+                await asyncio.sleep(interval)
+                await self.save()
+        finally:
+            await self.save()
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        self.data[key] = value
+        self.dirty = True
+
+    def __delitem__(self, key: str):
+        del self.data[key]
+        self.dirty = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
@@ -5,3 +5,15 @@ class RestartAllException(Exception):
 
 class AllCancelException(Exception):
     pass
+
+
+class ProcessExitError(Exception):
+    def __init__(self, args, returncode: int):
+        super().__init__(f"{args!r} exited with code {returncode}")
+        self.returncode = returncode
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, failures: int):
+        super().__init__(f"circuit of {name} is open after {failures} failures.")
+        self.failures = failures
@@ -0,0 +1,173 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from typing import Dict, Iterator, List
+
+from .results import Result, Results
+
+_STOP = object()
+
+
+class Journal:
+    """スーパーバイザーのライフサイクルイベントを JSON Lines 形式で追記する。
+
+    イベントはタプルとしてキューに積むだけで、整形とディスクへの書き込みは別スレッドでまとめて行うため、
+    イベントループがディスクI/Oを待つことはない。
+
+    記録するイベント: open, start, finish, cancel, restart, signal
+    """
+
+    def __init__(self, path, flush_interval: float = 0.5):
+        self.path = str(path)
+        self.flush_interval = flush_interval
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        # ファイルを開けない場合は、書き込みスレッドではなく呼び出し元で例外とする
+        self.file = open(self.path, "a")
+        # 追記するファイル内で、実行毎のタスクの識別子（id）を区別するための区切り
+        self.record("open", detail=os.getpid())
+        self.thread = threading.Thread(target=self.write, name="asy-journal")
+        self.thread.daemon = True
+        self.thread.start()
+        atexit.register(self.close)
+
+    def record(self, event: str, name: str = "", task=None, state=None, detail=None):
+        self.queue.put((time.time(), event, name, task, state, detail))
+
+    def start(self, task):
+        self.record("start", task.get_name(), id(task))
+
+    def finish(self, task):
+        if task.cancelled():
+            state, detail = "cancelled", None
+        else:
+            e = task.exception()
+            state, detail = ("failed", repr(e)) if e else ("succeed", None)
+        self.record("finish", task.get_name(), id(task), state, detail)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """書き込みスレッドが記録済みのイベントを全て書き出すまで待つ。書き出せなかった場合は False を返す"""
+        if not self.thread.is_alive():
+            return False
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    def write(self):
+        get = self.queue.get
+        with self.file as f:
+            while True:
+                item = get()
+                lines: List[str] = []
+                stop = False
+                deadline = time.monotonic() + self.flush_interval
+
+                while True:
+                    if item is _STOP:
+                        stop = True
+                        break
+                    elif isinstance(item, threading.Event):
+                        f.writelines(lines)
+                        f.flush()
+                        lines.clear()
+                        item.set()
+                    else:
+                        lines.append(self.format(item))
+
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = get(timeout=timeout)
+                    except queue.Empty:
+                        break
+
+                f.writelines(lines)
+                f.flush()
+                if stop:
+                    return
+
+    @staticmethod
+    def format(item) -> str:
+        t, event, name, task, state, detail = item
+        record: Dict = {"t": t, "event": event}
+        if name:
+            record["name"] = name
+        if task is not None:
+            record["task"] = task
+        if state is not None:
+            record["state"] = state
+        if detail is not None:
+            record["detail"] = detail
+        return json.dumps(record) + "\n"
+
+
+def iter_journal(path) -> Iterator[Dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_journal(path) -> Results:
+    """ジャーナルから子タスクの終了順にResultsを再構築する。終了が記録されていない子タスクはpendingとなる。
+
+    時刻はジャーナルに記録された時刻（time.time()）となる。
+    """
+    started: Dict[int, Dict] = {}
+    unfinished: List[Dict] = []
+    tasks = []
+    restarts = 0
+
+    for record in iter_journal(path):
+        event = record["event"]
+        if event == "open":
+            # 前回の実行で終了が記録されなかった子タスク
+            unfinished.extend(started.values())
+            started = {}
+            restarts = 0
+        elif event == "start":
+            record["restarts"] = restarts
+            started[record["task"]] = record
+        elif event == "restart":
+            restarts += 1
+        elif event == "finish":
+            start = started.pop(record["task"], None)
+            t = start["t"] if start else record["t"]
+            tasks.append(
+                Result(
+                    name=record["name"],
+                    state=record["state"],
+                    coro=record["name"],
+                    exception=record.get("detail"),
+                    result=None,
+                    started=t,
+                    ended=record["t"],
+                    duration=record["t"] - t,
+                    restarts=start["restarts"] if start else restarts,
+                )
+            )
+
+    for record in unfinished + list(started.values()):
+        tasks.append(
+            Result(
+                name=record["name"],
+                state="pending",
+                coro=record["name"],
+                exception=None,
+                result=None,
+                started=record["t"],
+                ended=0.0,
+                duration=0.0,
+                restarts=record["restarts"],
+            )
+        )
+
+    return Results(tuple(tasks))
@@ -0,0 +1,46 @@
+from typing import Any, Dict
+
+
+class Metrics:
+    """スーパーバイザーの状態を表す指標。参照時に子タスクを走査しないよう、逐次更新される値のみを保持する。"""
+
+    def __init__(self):
+        self.running = 0
+        self.succeed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.restarts = 0
+        self.loop_lag = 0.0
+        self.max_loop_lag = 0.0
+        self.stalls: Dict[str, Any] = {}
+        self.budgets: Dict[str, Any] = {}
+        self.ready = False
+        self.circuits: Dict[str, Any] = {}
+        self.last_results: Dict[str, Any] = {}
+
+    def set_results(self, results, max_failures: int = 10):
+        """直近のResultsの要約を保持する。参照の度に集計しないよう、ラウンドの終了時に一度だけ呼ばれる。"""
+        groups = results.groups
+        self.last_results = {
+            "count": {k: len(v) for k, v in groups.items()},
+            "failures": [
+                {"name": x["name"], "exception": x["exception"]}
+                for x in groups["failed"][-max_failures:]
+            ],
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "succeed": self.succeed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "restarts": self.restarts,
+            "loop_lag": self.loop_lag,
+            "max_loop_lag": self.max_loop_lag,
+            "stalls": {k: {**v} for k, v in self.stalls.items()},
+            "budgets": {k: {**v} for k, v in self.budgets.items()},
+            "ready": self.ready,
+            "circuits": {k: v.snapshot() for k, v in self.circuits.items()},
+            "last_results": self.last_results,
+        }
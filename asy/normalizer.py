@@ -4,7 +4,12 @@ from functools import wraps
 from typing import Any, get_type_hints
 
 from .protocols import PCancelToken, PSchedulable
-from .schedulable import CancelableAsyncTask, ForceCancelAsyncTask
+from .schedulable import (
+    CancelableAsyncTask,
+    ForceCancelAsyncTask,
+    CancelableAsyncStream,
+    ForceCancelAsyncStream,
+)
 
 
 def normalize_to_schedulable(value):
@@ -30,7 +35,9 @@ def normalize_to_schedulable(value):
     param_size = len(sig.parameters)
 
     if param_size == 0:
-        if inspect.iscoroutinefunction(target):
+        if inspect.isasyncgenfunction(target):
+            return ForceCancelAsyncStream(target)
+        elif inspect.iscoroutinefunction(target):
             return ForceCancelAsyncTask(target)
         else:
 
@@ -59,7 +66,9 @@ def normalize_to_schedulable(value):
             or hasattr(annotation, "is_cancelled")
             or getattr(annotation, "__annotations__", {}).get("is_cancelled")
         ):
-            if inspect.iscoroutinefunction(target):
+            if inspect.isasyncgenfunction(target):
+                return CancelableAsyncStream(target)
+            elif inspect.iscoroutinefunction(target):
                 return CancelableAsyncTask(target)
             else:
                 raise RuntimeError("同期関数はキャンセルトークンを受け入れられません")
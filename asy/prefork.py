@@ -0,0 +1,111 @@
+import logging
+import os
+import signal
+import time
+import traceback
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_targets(targets) -> List:
+    if not any(isinstance(x, str) for x in targets):
+        return list(targets)
+
+    from .cli import resolve_attrs
+
+    resolved = iter(resolve_attrs([x for x in targets if isinstance(x, str)]))
+    return [next(resolved) if isinstance(x, str) else x for x in targets]
+
+
+def get_exitcode(status: int) -> int:
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class Prefork:
+    """ワーカープロセスをフォークし、それぞれでスーパーバイザーを実行する。
+
+    preload=True の場合、ターゲットを親プロセスで一度だけインポートしてからフォークするため、
+    インポート済みのコードはワーカー間でコピーオンライトにより共有される。
+    異常終了したワーカーは再起動し、SIGINT・SIGTERMは全てのワーカーへ転送する。
+    """
+
+    def __init__(
+        self,
+        targets,
+        workers: int,
+        preload: bool = False,
+        respawn_delay: float = 1.0,
+        profile: str = "",
+    ):
+        self.targets = targets
+        self.workers = workers
+        self.preload = preload
+        self.profile = profile
+        self.respawn_delay = respawn_delay
+        self.pids: Dict[int, int] = {}
+        self.stopping = False
+
+    def run(self, handle_signals={"SIGINT", "SIGTERM"}):
+        targets = resolve_targets(self.targets) if self.preload else self.targets
+        signals = [getattr(signal, x) for x in handle_signals]
+        handlers = {sig: signal.signal(sig, self.handle_signal) for sig in signals}
+        exitcodes = []
+
+        try:
+            for index in range(self.workers):
+                self.spawn(index, targets)
+
+            while self.pids:
+                pid, status = os.wait()
+                index = self.pids.pop(pid)
+                exitcode = get_exitcode(status)
+                exitcodes.append(exitcode)
+
+                if exitcode != 0 and not self.stopping:
+                    logger.warning(f"[WORKER]{index} exited with {exitcode}. respawn.")
+                    time.sleep(self.respawn_delay)
+                    if not self.stopping:
+                        self.spawn(index, targets)
+        finally:
+            for sig, handler in handlers.items():
+                signal.signal(sig, handler)
+
+        return exitcodes
+
+    def handle_signal(self, signum, frame):
+        self.stopping = True
+        for pid in self.pids:
+            os.kill(pid, signum)
+
+    def spawn(self, index: int, targets):
+        pid = os.fork()
+        if pid:
+            self.pids[pid] = index
+            return
+
+        exitcode = 1
+        try:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, signal.SIG_DFL)
+            self.run_worker(index, targets)
+            exitcode = 0
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(exitcode)
+
+    def run_worker(self, index: int, targets):
+        import asy
+
+        if not self.preload:
+            targets = resolve_targets(targets)
+        supervisor = asy.supervise(*targets)
+
+        if self.profile:
+            path = os.path.join(self.profile, f"worker-{index}")
+            supervisor.set_config(profiler=asy.Profiler(path))
+
+        supervisor.run()
@@ -0,0 +1,48 @@
+import asyncio
+import weakref
+from enum import IntEnum
+from typing import List
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# イベントループ毎に、各優先度の子タスクが最後に実行を譲った時刻を記録する
+_activities: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, List[float]]"
+_activities = weakref.WeakKeyDictionary()
+
+
+def get_activity(loop: asyncio.AbstractEventLoop) -> List[float]:
+    activity = _activities.get(loop)
+    if activity is None:
+        activity = _activities[loop] = [float("-inf")] * len(Priority)
+    return activity
+
+
+async def yield_if_contended(priority: Priority, window: float = 0.01):
+    """実行を譲り、より優先度の高い子タスクが直近（window秒以内）に稼働していれば、さらにwindow秒だけ譲る。
+
+    優先度の高い子タスクは低い子タスクに譲らないため、混雑時にはより多くのループ時間を得る。
+    """
+    loop = asyncio.get_running_loop()
+    activity = get_activity(loop)
+    activity[priority] = loop.time()
+    await asyncio.sleep(0)
+
+    now = loop.time()
+    for higher in range(priority):
+        if now - activity[higher] < window:
+            await asyncio.sleep(window)
+            break
+
+
+def prioritize(func, priority: Priority):
+    """子タスクに優先度を設定する。優先度はキャンセルトークンを受け入れる子タスクのトークンに引き継がれる。"""
+    from .normalizer import normalize_to_schedulable
+
+    schedulable = normalize_to_schedulable(func)
+    schedulable.priority = Priority(priority)
+    return schedulable
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import re
+import sys
+import threading
+from collections import Counter
+from typing import Dict
+
+from .schedulable import get_base_name
+
+IDLE = "<idle>"
+
+
+class Profiler:
+    """イベントループのスレッドを別スレッドから定期的にサンプリングし、実行中の子タスク毎にスタックを集計する。
+
+    集計結果は子タスク毎に flamegraph.pl 等で扱える collapsed stack 形式（`<name>.folded`）で出力する。
+    """
+
+    def __init__(self, path, interval: float = 0.01):
+        self.path = str(path)
+        self.interval = interval
+        self.samples: Counter = Counter()
+
+    async def __call__(self):
+        loop = asyncio.get_running_loop()
+        stopped = threading.Event()
+        thread = threading.Thread(
+            target=self.sample,
+            args=(loop, threading.get_ident(), stopped),
+            name="asy-profiler",
+            daemon=True,
+        )
+        thread.start()
+        try:
+            await loop.create_future()
+        finally:
+            stopped.set()
+            thread.join()
+            self.dump()
+
+    def sample(self, loop, thread_id, stopped: threading.Event):
+        interval = self.interval
+        samples = self.samples
+
+        while not stopped.wait(interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                continue
+            task = asyncio.current_task(loop)
+            # 同じ関数から作られた子タスクは、再起動を跨いで一つにまとめる
+            name = get_base_name(task.get_name()) if task else IDLE
+            samples[name, self.collapse(frame)] += 1
+
+    @staticmethod
+    def collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            filename = os.path.basename(code.co_filename)
+            stack.append(f"{code.co_name} ({filename}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def group_by_task(self) -> Dict[str, Dict[str, int]]:
+        groups: Dict[str, Dict[str, int]] = {}
+        for (name, stack), count in self.samples.items():
+            groups.setdefault(name, {})[stack] = count
+        return groups
+
+    def dump(self):
+        os.makedirs(self.path, exist_ok=True)
+        for name, stacks in self.group_by_task().items():
+            filename = re.sub(r"[^\w.-]", "_", name) + ".folded"
+            with open(os.path.join(self.path, filename), "w") as f:
+                for stack, count in stacks.items():
+                    f.write(f"{stack} {count}\n")
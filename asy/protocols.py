@@ -4,6 +4,8 @@ import asyncio
 
 @runtime_checkable
 class PCancelToken(Protocol):
+    __slots__ = ()
+
     @property
     def is_cancelled(self) -> bool:
         raise NotImplementedError()
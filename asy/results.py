@@ -1,6 +1,14 @@
 import asyncio
-from typing import Sequence, Iterator, Union, Coroutine, Literal, Any
-from typing import TypedDict
+import csv
+import heapq
+from array import array
+from collections import deque
+from typing import Sequence, Iterator, Union, Coroutine, Literal, Any, Optional
+from typing import Callable, Dict, List, TypedDict
+
+from .columns import STATE_CODES, ColumnWriter, count_states, failure_rate, percentile
+
+CSV_COLUMNS = ("name", "state", "exception", "started", "duration", "restarts")
 
 
 class Result(TypedDict):
@@ -9,9 +17,20 @@ class Result(TypedDict):
     coro: Coroutine
     exception: Union[Exception, None]
     result: Any
+    started: float
+    ended: float
+    duration: float
+    restarts: int
 
     @staticmethod
-    def from_task(task: asyncio.Task):
+    def from_task(
+        task: asyncio.Task,
+        drop_payload: bool = False,
+        started: float = 0.0,
+        ended: float = 0.0,
+        restarts: int = 0,
+    ):
+        """started・ended はイベントループの単調時刻（loop.time()）、restarts は子タスクが開始されるまでの再起動回数"""
         if task.done():
             if task.cancelled():
                 state = "cancelled"
@@ -35,10 +54,63 @@ class Result(TypedDict):
             state=state,  # type: ignore
             coro=task.get_coro().__qualname__,
             exception=exception,
-            result=task.result() if state == "succeed" else None,
+            result=task.result() if state == "succeed" and not drop_payload else None,
+            started=started,
+            ended=ended,
+            duration=ended - started,
+            restarts=restarts,
         )
 
 
+class Retention:
+    """スーパーバイザーが保持するResultの方針。既定では最後のラウンドの全てのResultを保持する。
+
+    maxlen: 直近の件数のみ保持する（リングバッファ）
+    failures_only: 失敗したタスクのResultのみ保持する
+    drop_payloads: タスクの戻り値を保持しない
+    sink: 記録したResultを逐次渡す関数（例: ColumnWriter.write）。maxlen=0 と組み合わせると保持せずに書き出せる
+    across_restarts: 再起動を跨いで全てのラウンドのResultを保持する。既定では最後のラウンドのみ返す
+    """
+
+    def __init__(
+        self,
+        maxlen: Optional[int] = None,
+        failures_only: bool = False,
+        drop_payloads: bool = False,
+        sink: Optional[Callable[["Result"], Any]] = None,
+        across_restarts: bool = False,
+    ):
+        self.maxlen = maxlen
+        self.failures_only = failures_only
+        self.drop_payloads = drop_payloads
+        self.sink = sink
+        self.across_restarts = across_restarts
+
+    def collect(self) -> "deque[Result]":
+        return deque(maxlen=self.maxlen)
+
+    def record(
+        self,
+        collected: "deque[Result]",
+        task: asyncio.Task,
+        started: float = 0.0,
+        ended: float = 0.0,
+        restarts: int = 0,
+    ):
+        if self.failures_only and (task.cancelled() or not task.exception()):
+            return
+        result = Result.from_task(
+            task,
+            drop_payload=self.drop_payloads,
+            started=started,
+            ended=ended,
+            restarts=restarts,
+        )
+        collected.append(result)
+        if self.sink:
+            self.sink(result)
+
+
 class Results(Sequence[Result]):
     def __init__(self, tasks):
         self.tasks = tasks
@@ -52,6 +124,8 @@ class Results(Sequence[Result]):
             groups[task["state"]].append(task)
 
         self.groups = groups
+        self._columns: Optional[Dict[str, Any]] = None
+        self._sorted_durations: Optional[array] = None
 
     @staticmethod
     def from_tasks(tasks):
@@ -96,6 +170,50 @@ class Results(Sequence[Result]):
     def __iter__(self) -> Iterator[Result]:
         yield from self.tasks
 
+    def columns(self) -> Dict[str, Any]:
+        """列毎の配列に変換する。state は STATES の添字を表す1バイト整数の配列となる。変換は一度だけ行う"""
+        if self._columns is None:
+            tasks = self.tasks
+            codes = STATE_CODES
+            self._columns = {
+                "name": [x["name"] for x in tasks],
+                "state": array("b", [codes[x["state"]] for x in tasks]),
+                "exception": [x["exception"] for x in tasks],
+                "started": array("d", [x["started"] for x in tasks]),
+                "duration": array("d", [x["duration"] for x in tasks]),
+                "restarts": array("q", [x["restarts"] for x in tasks]),
+            }
+        return self._columns
+
+    def counts(self) -> Dict[str, int]:
+        return count_states(self.columns()["state"])
+
+    def failure_rate(self) -> float:
+        return failure_rate(self.columns()["state"])
+
+    def percentiles(self, *qs: float) -> Dict[float, float]:
+        """所要時間のパーセンタイル（0〜100）を返す。整列した所要時間は一度だけ作成して再利用する"""
+        if self._sorted_durations is None:
+            self._sorted_durations = array("d", sorted(self.columns()["duration"]))
+        return {q: percentile(self._sorted_durations, q) for q in (qs or (50, 90, 99))}
+
+    def slowest(self, n: int = 10) -> List[Result]:
+        durations = self.columns()["duration"]
+        indexes = heapq.nlargest(n, range(len(durations)), key=durations.__getitem__)
+        return [self.tasks[i] for i in indexes]
+
+    def to_csv(self, file):
+        """CSVとして書き出す。行毎に辞書を作らず、逐次書き出す"""
+        writer = csv.writer(file)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(tuple(x[k] for k in CSV_COLUMNS) for x in self.tasks)
+
+    def to_columns(self, path, batch_size: int = 10000):
+        """列毎のファイルとして書き出す。読み込みには asy.columns.read_columns を用いる"""
+        with ColumnWriter(path, batch_size=batch_size) as writer:
+            for task in self.tasks:
+                writer.write(task)
+
     def filter(
         self,
         *,
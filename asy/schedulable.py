@@ -1,30 +1,119 @@
 from typing import Type, TypeVar, Tuple
 from .protocols import PAwaitable, PCancelToken, PSchedulable
 
-from .tokens import CancelToken, ForceCancelToken
+from .tokens import CancelToken, ForceCancelToken, SharedCancelToken
+from .channel import Channel
+from .priority import Priority
 import asyncio
+import itertools
 
 T = TypeVar("T", bound=PAwaitable)
 
+_task_counter = itertools.count(1)
+
+
+def new_task_name(name: str) -> str:
+    """子タスクの名前。同じ関数から作られた子タスク同士も区別できるよう、連番を付ける"""
+    return f"{name}-{next(_task_counter)}"
+
+
+def get_base_name(task_name: str) -> str:
+    """new_task_name で付けた連番を取り除く"""
+    return task_name.rsplit("-", 1)[0]
+
 
 class Schedulable(PSchedulable):
+    priority = Priority.NORMAL
+
     def __init__(self, func):
         self.factory = func
+        self.name = getattr(func, "__qualname__", None) or type(func).__qualname__
 
 
 class CancelableAsyncTask(Schedulable):
     """キャンセルトークンを受け入れることができるタスクとしてマークするためのクラス"""
 
     def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
-        token = CancelToken()
-        task = asyncio.create_task(self.factory(token))
+        token = CancelToken(self.priority)
+        task = asyncio.create_task(self.factory(token), name=new_task_name(self.name))
         return token, task
 
 
 class ForceCancelAsyncTask(Schedulable):
-    """キャンセルトークンを受け入れできないタスクとしてマークするためのクラス。スーパーバイザーがキャンセルを検知した時、asyncioのcancel()が直接呼ばれる"""
+    """キャンセルトークンを受け入れできないタスクとしてマークするためのクラス。
+
+    スーパーバイザーがキャンセルを検知した時、asyncioのcancel()が直接呼ばれる
+    """
 
     def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
-        task = asyncio.create_task(self.factory())
+        task = asyncio.create_task(self.factory(), name=new_task_name(self.name))
         token = ForceCancelToken(task)
         return token, task
+
+
+class StreamSchedulable(Schedulable):
+    """非同期ジェネレータをタスクとしてマークするためのクラス。生成された値は有界のチャネルへ送られる"""
+
+    def __init__(self, func):
+        super().__init__(func)
+        self.channel = Channel()
+
+    @staticmethod
+    async def pump(agen, channel: Channel, token=None) -> int:
+        count = 0
+        try:
+            async for item in agen:
+                # 受信側がいない場合も、キャンセルされれば送信の待機を打ち切る
+                if not await channel.put(item, token):
+                    break
+                count += 1
+        finally:
+            await agen.aclose()
+        return count
+
+
+class CancelableAsyncStream(StreamSchedulable):
+    """キャンセルトークンを受け入れることができる非同期ジェネレータ"""
+
+    def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
+        token = CancelToken(self.priority)
+        coro = self.pump(self.factory(token), self.channel, token)
+        task = asyncio.create_task(coro, name=new_task_name(self.name))
+        return token, task
+
+
+class ForceCancelAsyncStream(StreamSchedulable):
+    """キャンセルトークンを受け入れできない非同期ジェネレータ。キャンセル時はasyncioのcancel()が直接呼ばれる"""
+
+    def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
+        coro = self.pump(self.factory(), self.channel)
+        task = asyncio.create_task(coro, name=new_task_name(self.name))
+        token = ForceCancelToken(task)
+        return token, task
+
+
+class ExecutorTask(Schedulable):
+    """キャンセルトークンを受け入れる同期関数を、スレッドプールやプロセスプールで実行するためのクラス。
+
+    トークンは共有メモリ上に置かれるため、スーパーバイザーのキャンセルはRPCやポーリングなしに他プロセスへ伝わる。
+    """
+
+    def __init__(self, func, executor=None):
+        super().__init__(func)
+        self.executor = executor
+
+    def schedule(self) -> Tuple[PCancelToken, asyncio.Task]:
+        token = SharedCancelToken()
+        task = asyncio.create_task(
+            self.run_in_executor(token), name=new_task_name(self.name)
+        )
+        return token, task
+
+    async def run_in_executor(self, token: SharedCancelToken):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, self.factory, token)
+        finally:
+            # タスクが強制キャンセルされた場合も、実行中のワーカーに終了を伝える
+            token.is_cancelled = True
+            token.close()
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import logging
 import signal
 from functools import partial
-from typing import Any, Callable, Set, Tuple, Union
+from typing import Any, Callable, Dict, Set, Tuple, Union
 
 from asy.protocols import PCancelToken
 from asy.exceptions import RestartAllException, AllCancelException
 
+from .batch import Batch
+from .breaker import CircuitBreaker
+from .channel import Channel
+from .metrics import Metrics
 from .normalizer import normalize_to_schedulable
+from .results import Results, Retention
+from .schedulable import StreamSchedulable
+from .threaded import SupervisorThread
 from .tokens import CancelToken
 
 logger = logging.getLogger(__name__)
@@ -21,23 +29,72 @@ class SupervisorBase:
     ):
         tmp = [normalize_to_schedulable(x) for x in schedulables]
         self.schedulables = tmp
+        self.metrics = Metrics()
+        # 実行中の監督毎のイベントループと子タスク。cancel_threadsafe から参照する
+        self.observing: Dict[PCancelToken, Tuple] = {}
+        self.cancel_requested: Set[PCancelToken] = set()
+        # 最初のラウンドが始まる前に cancel_threadsafe が呼ばれた場合も取りこぼさないための印
+        self.cancel_pending = False
+        for schedulable in tmp:
+            if isinstance(schedulable, CircuitBreaker):
+                circuits = self.metrics.circuits
+                # 同じ関数を包んだ遮断器同士が上書きし合わないよう、重複には連番を付ける
+                name = schedulable.name
+                if name in circuits:
+                    name = f"{name}-{len(circuits) + 1}"
+                circuits[name] = schedulable
         self.set_config()
         self.__post_init__()
 
     def __post_init__(self):
         pass
 
+    @staticmethod
+    def map(func, iterable, concurrency: int = 100, ordered: bool = True) -> Batch:
+        """関数をイテラブルの各要素へ適用する子タスクを作成する。結果は入力順（ordered=False の場合は完了順）のリストとなる。
+
+        作成した子タスクは他の子タスクと同様に監督でき、直接 await することもできる。
+        再起動後も処理する場合、イテレータの代わりにイテラブルを返す関数を渡す。
+        """
+        return Batch(func, iterable, concurrency=concurrency, ordered=ordered)
+
     def set_config(
-        self, on_succeed=None, on_error=None, on_cancel=None, on_completed=None
+        self,
+        on_succeed=None,
+        on_error=None,
+        on_cancel=None,
+        on_completed=None,
+        on_stall=None,
+        watchdog=None,
+        profiler=None,
+        retention=None,
+        channel=None,
+        journal=None,
+        budget=None,
     ):
+        # ログが無効な場合に文字列化のコストを払わないよう、遅延フォーマットを用いる
         self.on_succeed = on_succeed or (
-            lambda task: logger.info(f"[SUCCESS]{task.result()}")
+            lambda task: logger.info("[SUCCESS]%s", task.result())
         )
-        self.on_error = on_error or (lambda task: logger.info(f"[FAIL]{task}"))
-        self.on_cancel = on_cancel or (lambda task: logger.info(f"[CANCEL]{task}"))
+        self.on_error = on_error or (lambda task: logger.info("[FAIL]%s", task))
+        self.on_cancel = on_cancel or (lambda task: logger.info("[CANCEL]%s", task))
         self.on_completed = on_completed or (
-            lambda task: logger.info(f"[COMPLETE]{task}")
+            lambda task: logger.info("[COMPLETE]%s", task)
+        )
+        self.on_stall = on_stall or (
+            lambda task, stall: logger.warning(f"[STALL]{task}\n{stall['stack']}")
         )
+        self.watchdog = watchdog
+        self.profiler = profiler
+        self.retention = retention or Retention()
+        self.journal = journal
+        self.budget = budget
+
+        # 非同期ジェネレータが生成した値は、スーパーバイザーのチャネルに集約する
+        self.channel = Channel() if channel is None else channel
+        for schedulable in self.schedulables:
+            if isinstance(schedulable, StreamSchedulable):
+                schedulable.channel = self.channel
 
     @staticmethod
     def exists_loop():
@@ -52,21 +109,35 @@ class SupervisorBase:
         task = asyncio.create_task(self(token))
         return token, task
 
-    def run(self, handle_signals: Set[str] = {"SIGINT", "SIGTERM"}):
-        """新たなイベントループ上に、管理している関数群をスケジューリングし、完了まで監督する。このメソッドは自身の状態を変更しない。"""
+    def run(
+        self, handle_signals: Set[str] = {"SIGINT", "SIGTERM"}, eager: bool = False
+    ):
+        """新たなイベントループ上に、管理している関数群をスケジューリングし、完了まで監督する。このメソッドは自身の状態を変更しない。
+
+        eager=True の場合、タスクを生成時に即座に実行する（Python 3.12 以降の asyncio.eager_task_factory が必要）。
+        """
         if self.exists_loop():
             raise RuntimeError("Can not run in event loop.")
 
         loop = asyncio.new_event_loop()
         token = CancelToken()
 
-        def handle_cancel(token):
+        if eager:
+            factory = getattr(asyncio, "eager_task_factory", None)
+            if factory is None:
+                logger.warning("eager task factory requires Python 3.12+. ignored.")
+            else:
+                loop.set_task_factory(factory)
+
+        def handle_cancel(token, sig_name):
             print("cancel requested.")
-            token.is_cancelled = True
+            if self.journal:
+                self.journal.record("signal", detail=sig_name)
+            self._cancel(token)
 
         for sig_name in handle_signals:
             sig = getattr(signal, sig_name)
-            loop.add_signal_handler(sig, partial(handle_cancel, token))
+            loop.add_signal_handler(sig, partial(handle_cancel, token, sig_name))
 
         try:
             result = loop.run_until_complete(self(token))
@@ -74,13 +145,26 @@ class SupervisorBase:
             raise
         finally:
             loop.close()
+            if self.journal:
+                self.journal.flush()
 
         return result
 
+    def run_in_thread(self) -> SupervisorThread:
+        """専用スレッドのイベントループ上で監督を開始し、スレッドセーフに操作できるハンドルを返す。"""
+        handle = SupervisorThread(self)
+        handle.start()
+        return handle
+
     async def __call__(self, token: PCancelToken):
         """管理している関数群をスケジューリングし、完了まで監督する。このメソッドは自身の状態を変更しない。"""
         is_restart = True
         finalized_result = None
+        retention = self.retention
+        # ラウンドを跨いで保持するのは across_restarts が指定された場合のみ
+        collected = retention.collect() if retention.across_restarts else None
+        loop = asyncio.get_running_loop()
+        self.channel.open()
 
         def restart_callback(e):
             nonlocal token
@@ -96,30 +180,105 @@ class SupervisorBase:
                 raise Exception(f"Unkown exception: {e}")
             return e
 
-        while not token.is_cancelled:
-            is_restart = False
-            tokens, tasks, future, sub_futures = self._start(restart_callback)
-
-            async def observe_cancel(future, token, tokens):
-                while not future.done():
-                    await asyncio.sleep(0.1)
-                    if token.is_cancelled:
-                        for t in tokens:
-                            t.is_cancelled = True
-
-            task = asyncio.create_task(observe_cancel(future, token, tokens))
-            sub_futures.append(task)
-
-            result = await future
-            self.cancel_sub_futures(sub_futures)
-            finalized_result = await self.finalize_result(result)
+        try:
+            while not token.is_cancelled:
+                if self.cancel_pending:
+                    token.is_cancelled = True
+                    break
+                is_restart = False
+                round_collected = retention.collect()
+                running, future, sub_futures = self._start(
+                    restart_callback, round_collected
+                )
+                self.metrics.ready = True
+
+                async def observe_cancel(future, token, running):
+                    while not future.done():
+                        await asyncio.sleep(0.1)
+                        if self.cancel_pending:
+                            token.is_cancelled = True
+                        if token.is_cancelled:
+                            self.propagate_cancel(running)
+                            return
+
+                task = asyncio.create_task(observe_cancel(future, token, running))
+                sub_futures.append(task)
+                self.observing[token] = (loop, running, task)
+
+                if self.watchdog:
+                    task = asyncio.create_task(
+                        self.watchdog(running, self.metrics, self.on_stall)
+                    )
+                    sub_futures.append(task)
+
+                if self.budget:
+                    task = asyncio.create_task(
+                        self.budget(running, self.metrics, restart_callback)
+                    )
+                    sub_futures.append(task)
+
+                if self.profiler:
+                    task = asyncio.create_task(self.profiler())
+                    sub_futures.append(task)
+
+                await future
+                self.cancel_sub_futures(sub_futures)
+                finalized_result = await self.finalize_result(round_collected)
+                self.metrics.set_results(finalized_result)
+                if collected is not None:
+                    collected.extend(round_collected)
+
+                if is_restart and not self.is_cancel_requested(token):
+                    self.metrics.restarts += 1
+                    if self.journal:
+                        self.journal.record("restart")
+                    token.is_cancelled = False
+                else:
+                    token.is_cancelled = True
+        finally:
+            self.observing.pop(token, None)
+            self.cancel_requested.discard(token)
+            self.cancel_pending = False
+            self.metrics.ready = False
+            self.channel.close()
+
+        if collected is not None and finalized_result is not None:
+            finalized_result = Results(tuple(collected))
+        return finalized_result
 
-            if is_restart:
-                token.is_cancelled = False
-            else:
-                token.is_cancelled = True
+    def cancel_threadsafe(self):
+        """実行中の監督をキャンセルする。他のスレッドやシグナルハンドラからも安全に呼び出せる。
 
-        return finalized_result
+        トークンのポーリングを待たず、イベントループを起こして即座に子タスクへキャンセルを伝える。
+        最初のラウンドの開始前に呼ばれた場合は、開始時にキャンセルされる。
+        """
+        self.cancel_pending = True
+        for token, (loop, running, observer) in list(self.observing.items()):
+            try:
+                loop.call_soon_threadsafe(self._cancel, token)
+            except RuntimeError:
+                # 既にイベントループが閉じられている
+                pass
+
+    def is_cancel_requested(self, token) -> bool:
+        return self.cancel_pending or token in self.cancel_requested
+
+    def _cancel(self, token):
+        # イベントループのスレッドで実行されるため、その時点のラウンドの子タスクへ伝える
+        token.is_cancelled = True
+        if token not in self.observing:
+            return
+        self.cancel_requested.add(token)
+        loop, running, observer = self.observing[token]
+        if not observer.done():
+            observer.cancel()
+            self.propagate_cancel(running)
+
+    def propagate_cancel(self, running):
+        if self.journal:
+            self.journal.record("cancel", detail=len(running))
+        for t in running.values():
+            t.is_cancelled = True
 
     @classmethod
     def cancel_sub_futures(cls, sub_futures):
@@ -127,57 +286,81 @@ class SupervisorBase:
             sub.cancel()
 
     @classmethod
-    async def finalize_result(cls, wait_result):
-        result = cls.get_result_from_wait(wait_result)
+    async def finalize_result(cls, collected):
+        result = Results(tuple(collected))
         await asyncio.sleep(0)
         return result
 
-    @staticmethod
-    def get_result_from_wait(wait_result):
-        return wait_result[0]
-
-    def _start(self, restart_callback):
+    def _start(self, restart_callback, collected):
         schedulables = self.schedulables
         on_succeed = self.on_succeed
         on_error = self.on_error
         on_cancel = self.on_cancel
         on_completed = self.on_completed
+        metrics = self.metrics
+        record = self.retention.record
+        journal = self.journal
+
+        # 完了したタスクを即座に解放できるよう、実行中のタスクのみを保持する
+        running: Dict[asyncio.Task, Any] = {}
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # 子タスクは同時にスケジュールされるため、開始時刻はラウンド毎に一度だけ取得する
+        started = loop.time()
+        restarts = metrics.restarts
 
         def on_done(task):
+            del running[task]
+            metrics.running -= 1
             try:
                 result = task.result()
+                metrics.succeed += 1
                 on_succeed(task)
 
             except RestartAllException as e:
                 restart_callback(e)
+                metrics.cancelled += 1
                 on_cancel(task)
 
             except AllCancelException as e:
                 restart_callback(e)
+                metrics.cancelled += 1
                 on_cancel(task)
 
             except asyncio.CancelledError as e:
+                metrics.cancelled += 1
                 on_cancel(task)
 
             except Exception:  # pylint: disable=broad-except
+                metrics.failed += 1
                 on_error(task)
 
             on_completed(task)
+            record(collected, task, started, loop.time(), restarts)
+            if journal:
+                journal.finish(task)
+
+            if not running and not future.done():
+                future.set_result(None)
 
-        tasks = []
-        tokens = []
         sub_futures = []  # type: ignore
 
-        for index, schedulable in enumerate(schedulables):
+        # add_done_callbackはコンテキストを省略するとタスク毎にコピーするため、共有する
+        context = contextvars.copy_context()
+
+        for schedulable in schedulables:
             token, task = schedulable.schedule()
-            tokens.append(token)
-            tasks.append(task)
-            task.add_done_callback(on_done)
+            running[task] = token
+            task.add_done_callback(on_done, context=context)
+            if journal:
+                journal.start(task)
 
-        future = asyncio.create_task(
-            asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED)
-        )
-        return tokens, tasks, future, sub_futures
+        metrics.running += len(running)
+
+        if not running:
+            future.set_result(None)
+
+        return running, future, sub_futures
 
 
 class Supervisor(SupervisorBase):
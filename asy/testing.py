@@ -0,0 +1,58 @@
+import asyncio
+import selectors
+
+
+class VirtualTimeSelector(selectors.DefaultSelector):
+    """I/Oの準備ができていない場合、待つ代わりにイベントループの仮想時刻をタイムアウト分進める"""
+
+    def __init__(self):
+        super().__init__()
+        self.loop: "VirtualTimeLoop" = None  # type: ignore
+
+    def select(self, timeout=None):
+        events = super().select(0)
+        if events or timeout == 0:
+            return events
+        if timeout is None:
+            # 予定されたタイマーが無い場合、他のスレッドからの通知等を実際に待つ
+            return super().select(None)
+        self.loop.advance(timeout)
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """仮想時刻で動作するイベントループ。
+
+    asyncio.sleep やタイマーは待たずに即座に時刻を進めるため、長時間の再起動やタイムアウトの挙動を短時間で決定的に再現できる。
+    time.monotonic() を直接参照する処理や、別スレッドの処理の完了は仮想時刻に従わない。
+    """
+
+    def __init__(self):
+        selector = VirtualTimeSelector()
+        super().__init__(selector)
+        selector.loop = self
+        self.virtual_time = 0.0
+
+    def time(self) -> float:
+        return self.virtual_time
+
+    def advance(self, seconds: float):
+        self.virtual_time += seconds
+
+
+def run(main):
+    """仮想時刻のイベントループ上で awaitable を完了まで実行し、結果を返す"""
+    loop = VirtualTimeLoop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(main)
+    finally:
+        try:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,83 @@
+import asyncio
+import concurrent.futures
+import threading
+
+from .tokens import CancelToken
+
+
+class SupervisorThread:
+    """専用スレッドのイベントループ上でスーパーバイザーを実行する。
+
+    メインスレッドを明け渡せない同期アプリケーションに、非同期のワーカーを組み込むために用いる。
+    start・stop・result はどのスレッドからでも呼び出せる。
+    """
+
+    def __init__(self, supervisor, name: str = "asy-supervisor"):
+        self.supervisor = supervisor
+        self.name = name
+        self.lock = threading.Lock()
+        self.loop: asyncio.AbstractEventLoop = None  # type: ignore
+        self.thread: threading.Thread = None  # type: ignore
+        self.token: CancelToken = None  # type: ignore
+        self.future: concurrent.futures.Future = None  # type: ignore
+
+    @property
+    def is_running(self):
+        return self.future is not None and not self.future.done()
+
+    def start(self) -> concurrent.futures.Future:
+        """スレッドを起動し、監督の結果（Results）を受け取るフューチャーを返す"""
+        with self.lock:
+            if self.is_running:
+                raise Exception("already running.")
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=self._run, args=(loop,), name=self.name)
+            thread.daemon = True
+            thread.start()
+
+            token = CancelToken()
+            future = asyncio.run_coroutine_threadsafe(self.supervisor(token), loop)
+            future.add_done_callback(lambda f: loop.call_soon_threadsafe(loop.stop))
+
+            self.loop = loop
+            self.thread = thread
+            self.token = token
+            self.future = future
+            return future
+
+    def stop(self, timeout=None):
+        """監督をキャンセルし、スレッドの終了を待って結果を返す"""
+        with self.lock:
+            if self.future is None:
+                raise Exception("The supervisor has not been started yet")
+
+            if not self.future.done():
+                try:
+                    self.loop.call_soon_threadsafe(self.supervisor._cancel, self.token)
+                except RuntimeError:
+                    # 既にイベントループが閉じられている
+                    pass
+
+            result = self.future.result(timeout)
+            self.thread.join(timeout)
+            return result
+
+    def result(self, timeout=None):
+        """監督が完了するまで待ち、結果を返す"""
+        return self.future.result(timeout)
+
+    def _run(self, loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+            if self.supervisor.journal:
+                self.supervisor.journal.flush()
@@ -1,15 +1,34 @@
 from .protocols import PCancelToken
+from .priority import Priority, yield_if_contended
 import asyncio
+import time
+from typing import Any
 
 
 class CancelToken(PCancelToken):
-    is_cancelled: bool = False
+    __slots__ = ("is_cancelled", "last_heartbeat", "priority")
 
-    def __init__(self):
+    is_cancelled: bool
+    last_heartbeat: float
+    priority: Priority
+
+    def __init__(self, priority: Priority = Priority.NORMAL):
         self.is_cancelled = False
+        self.last_heartbeat = 0.0
+        self.priority = priority
+
+    def heartbeat(self):
+        """処理が進んでいることをウォッチドッグに通知する"""
+        self.last_heartbeat = time.monotonic()
+
+    async def yield_if_contended(self):
+        """イベントループが混雑している場合、優先度に応じて他の子タスクへ実行時間を譲る"""
+        await yield_if_contended(self.priority)
 
 
 class ForceCancelToken(PCancelToken):
+    __slots__ = ("task",)
+
     def __init__(self, task: asyncio.Task):
         self.task = task
 
@@ -24,6 +43,8 @@ class ForceCancelToken(PCancelToken):
 
 
 class CallbackCancelToken(PCancelToken):
+    __slots__ = ("callback", "_is_cancelled")
+
     def __init__(self, callback):
         self.callback = callback
         self._is_cancelled = False
@@ -37,3 +58,50 @@ class CallbackCancelToken(PCancelToken):
         self._is_cancelled = value
         if not value:
             self.callback()
+
+
+class SharedCancelToken(PCancelToken):
+    """共有メモリ上の1バイトで表現されるキャンセルトークン。
+
+    ピクル化すると同じ共有メモリを参照するトークンとして復元されるため、別プロセスの同期関数からも
+    メモリの読み込みのみでキャンセルを確認できる。作成したプロセスで close() すると共有メモリを解放する。
+    """
+
+    __slots__ = ("name", "_shm", "_owner")
+
+    name: str
+    _shm: Any
+    _owner: bool
+
+    def __init__(self, name: str = None):  # type: ignore
+        from multiprocessing import shared_memory
+
+        if name is None:
+            self._shm = shared_memory.SharedMemory(create=True, size=1)
+            self._shm.buf[0] = 0
+            self._owner = True
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            self._owner = False
+        self.name = self._shm.name
+
+    def __reduce__(self):
+        return (self.__class__, (self.name,))
+
+    @property
+    def is_cancelled(self) -> bool:
+        buf = self._shm.buf
+        return buf is None or buf[0] == 1
+
+    @is_cancelled.setter
+    def is_cancelled(self, value: bool):
+        buf = self._shm.buf
+        if buf is not None:
+            buf[0] = 1 if value else 0
+
+    def close(self):
+        if self._shm.buf is None:
+            return
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
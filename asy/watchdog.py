@@ -0,0 +1,81 @@
+import asyncio
+import io
+import logging
+import time
+from typing import TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class Stall(TypedDict):
+    name: str
+    idle: float
+    stack: str
+
+
+class Watchdog:
+    """イベントループの遅延と、ハートビートが途絶えた子タスクを検知する。
+
+    ハートビート（token.heartbeat()）を一度も送っていない子タスクは停滞の監視対象としない。
+    threshold=0 の場合、停滞は監視せずイベントループの遅延のみを計測する。
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        threshold: float = 10.0,
+        lag_threshold: float = 0.1,
+        stack_limit: int = 20,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag_threshold = lag_threshold
+        self.stack_limit = stack_limit
+
+    async def __call__(self, running, metrics, on_stall):
+        interval = self.interval
+        threshold = self.threshold
+        lag_threshold = self.lag_threshold
+        stalls = metrics.stalls
+
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+
+            lag = max(now - expected, 0.0)
+            metrics.loop_lag = lag
+            if lag > metrics.max_loop_lag:
+                metrics.max_loop_lag = lag
+            if lag > lag_threshold:
+                logger.warning(f"[LAG]event loop was blocked for {lag:.3f}s")
+
+            if not threshold:
+                continue
+
+            stalled = set()
+            for task, token in list(running.items()):
+                last_heartbeat = getattr(token, "last_heartbeat", 0.0)
+                if task.done() or not last_heartbeat:
+                    continue
+
+                idle = now - last_heartbeat
+                if idle <= threshold:
+                    continue
+
+                name = task.get_name()
+                stalled.add(name)
+                if name in stalls:
+                    stalls[name]["idle"] = idle
+                else:
+                    stall = Stall(name=name, idle=idle, stack=self.get_stack(task))
+                    stalls[name] = stall
+                    on_stall(task, stall)
+
+            for name in stalls.keys() - stalled:
+                del stalls[name]
+
+    def get_stack(self, task: asyncio.Task) -> str:
+        buf = io.StringIO()
+        task.print_stack(limit=self.stack_limit, file=buf)
+        return buf.getvalue()
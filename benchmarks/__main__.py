@@ -0,0 +1,93 @@
+"""ベンチマークを一括で実行し、バージョン間で比較できるようJSONで出力する。
+
+    python -m benchmarks [--quick] [--output result.json] [--compare baseline.json]
+"""
+import argparse
+import datetime
+import importlib
+import json
+import platform
+import subprocess
+import sys
+
+# モジュール名: (既定の規模, --quick 時の規模)
+BENCHMARKS = {
+    "bench_schedule": (100_000, 5_000),
+    "bench_cancel": (10_000, 1_000),
+    "bench_normalizer": (100_000, 5_000),
+    "bench_results": (1_000_000, 20_000),
+    "bench_filewatcher": (10_000, 1_000),
+    "bench_reload": (50, 5),
+    "bench_batch": (1_000_000, 20_000),
+    "bench_micro": (50_000, 2_000),
+}
+
+
+def get_revision():
+    try:
+        command = ["git", "rev-parse", "--short", "HEAD"]
+        output = subprocess.check_output(command, stderr=subprocess.DEVNULL)
+        return output.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(names, quick: bool = False):
+    results = []
+    for name in names:
+        count, quick_count = BENCHMARKS[name]
+        module = importlib.import_module(f"benchmarks.{name}")
+        try:
+            results.extend(module.main(quick_count if quick else count))
+        except ImportError as e:
+            print(f"skip {name}: {e}", file=sys.stderr)
+
+    return {
+        "revision": get_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": datetime.datetime.now().isoformat(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def compare(report, baseline):
+    """数値の項目について、基準値に対する比率を表示する"""
+    base = {x["name"]: x for x in baseline["results"]}
+    for result in report["results"]:
+        other = base.get(result["name"])
+        if other is None:
+            continue
+        for key, value in result.items():
+            if key in ("name", "count") or not isinstance(value, (int, float)):
+                continue
+            if other.get(key):
+                ratio = value / other[key]
+                print(f"{result['name']}.{key}: {ratio:.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("names", nargs="*", choices=[[], *BENCHMARKS])
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--compare")
+    args = parser.parse_args(argv)
+
+    report = run(args.names or list(BENCHMARKS), quick=args.quick)
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
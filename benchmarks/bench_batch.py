@@ -0,0 +1,44 @@
+"""supervise.map の要素あたりのコストを、素の asyncio.create_task と比較する。
+
+    python benchmarks/bench_batch.py [count]
+"""
+import asyncio
+import json
+import sys
+import time
+
+import asy
+
+
+async def job(item):
+    return item
+
+
+def bench_create_task(count: int):
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(asyncio.create_task(job(i)) for i in range(count)))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return {"name": "batch.create_task", "count": count, "seconds": elapsed}
+
+
+def bench_map(count: int, concurrency: int = 100):
+    async def main():
+        start = time.perf_counter()
+        await asy.supervise.map(job, range(count), concurrency=concurrency)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(main())
+    return {"name": "batch.map", "count": count, "seconds": elapsed}
+
+
+def main(count: int = 1_000_000):
+    return [bench_create_task(count), bench_map(count)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for result in main(count):
+        print(json.dumps(result))
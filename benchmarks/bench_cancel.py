@@ -0,0 +1,59 @@
+"""親トークンのキャンセルから、全ての子タスクが終了するまでの遅延を計測する。
+
+    python benchmarks/bench_cancel.py [count]
+"""
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+import asy
+
+
+async def cancelable_child(token):
+    while not token.is_cancelled:
+        await asyncio.sleep(0.01)
+
+
+async def force_cancel_child():
+    while True:
+        await asyncio.sleep(0.01)
+
+
+def bench_cancel_latency(func, count: int, repeat: int = 5):
+    latencies = []
+
+    async def main():
+        supervisor = asy.supervise(*[func] * count)
+        token = asy.CancelToken()
+        task = asyncio.create_task(supervisor(token))
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        token.is_cancelled = True
+        await task
+        return time.perf_counter() - start
+
+    for _ in range(repeat):
+        latencies.append(asyncio.run(main()))
+
+    return {
+        "name": f"cancel_latency.{func.__name__}",
+        "count": count,
+        "median_seconds": statistics.median(latencies),
+        "max_seconds": max(latencies),
+    }
+
+
+def main(count: int = 10_000):
+    return [
+        bench_cancel_latency(cancelable_child, count),
+        bench_cancel_latency(force_cancel_child, count),
+    ]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for result in main(count):
+        print(json.dumps(result))
@@ -0,0 +1,48 @@
+"""FileWatcher が大きなディレクトリツリーを一回走査するのに要する時間を計測する。
+
+    python benchmarks/bench_filewatcher.py [files]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+from asy.components.filewatcher import raise_restart_if_file_changed
+
+
+def make_tree(root: str, files: int, per_dir: int = 100):
+    for i in range(files):
+        subdir = os.path.join(root, f"pkg{i // per_dir}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"mod{i}.py"), "w") as f:
+            f.write("")
+
+
+def bench_scan(files: int, repeat: int = 5):
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, files)
+        mtimes = raise_restart_if_file_changed({}, [root])
+
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            raise_restart_if_file_changed(mtimes, [root])
+            elapsed.append(time.perf_counter() - start)
+
+    return {
+        "name": "filewatcher.scan",
+        "count": files,
+        "seconds": min(elapsed),
+        "files_per_second": files / min(elapsed),
+    }
+
+
+def main(count: int = 10_000):
+    return [bench_scan(count)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    for result in main(count):
+        print(json.dumps(result))
@@ -0,0 +1,72 @@
+"""MicroWorkers のワーカーあたりのメモリと一巡の時間を、子タスク毎に asyncio.Task とトークンを作る場合と比較する。
+
+    python benchmarks/bench_micro.py [count]
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+import asy
+from asy.components import MicroWorkers
+
+TICKS = 3
+
+
+async def looping(token):
+    for _ in range(TICKS):
+        if token.is_cancelled:
+            break
+        await asyncio.sleep(0)
+
+
+def stepping():
+    for _ in range(TICKS):
+        yield
+
+
+def measure(name: str, count: int, create):
+    async def main():
+        tracemalloc.start()
+        start = time.perf_counter()
+        awaitable = create()
+        peak = tracemalloc.get_traced_memory()[1]
+        await awaitable
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        return elapsed, peak
+
+    elapsed, peak = asyncio.run(main())
+    return {
+        "name": name,
+        "count": count,
+        "seconds": elapsed,
+        "bytes_per_child": peak / count,
+    }
+
+
+def bench_tasks(count: int):
+    def create():
+        return asy.supervise(*[looping] * count)(asy.CancelToken())
+
+    return measure("micro.tasks", count, create)
+
+
+def bench_micro(count: int):
+    def create():
+        workers = [stepping() for _ in range(count)]
+        return MicroWorkers(workers)(asy.CancelToken())
+
+    return measure("micro.workers", count, create)
+
+
+def main(count: int = 50_000):
+    return [bench_tasks(count), bench_micro(count)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    for result in main(count):
+        print(json.dumps(result))
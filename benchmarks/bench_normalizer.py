@@ -0,0 +1,54 @@
+"""normalize_to_schedulable のスループットを計測する。
+
+    python benchmarks/bench_normalizer.py [count]
+"""
+import json
+import sys
+import time
+
+from asy.normalizer import normalize_to_schedulable
+
+
+async def no_args():
+    ...
+
+
+async def one_args(token):
+    ...
+
+
+def sync_func():
+    ...
+
+
+class CallableOneArg:
+    async def __call__(self, token):
+        ...
+
+
+def bench_normalize(func, count: int):
+    start = time.perf_counter()
+    for _ in range(count):
+        normalize_to_schedulable(func)
+    elapsed = time.perf_counter() - start
+
+    name = getattr(func, "__name__", type(func).__name__)
+    return {
+        "name": f"normalize.{name}",
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed,
+    }
+
+
+def main(count: int = 100_000):
+    return [
+        bench_normalize(func, count)
+        for func in (no_args, one_args, sync_func, CallableOneArg())
+    ]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for result in main(count):
+        print(json.dumps(result))
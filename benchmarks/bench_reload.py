@@ -0,0 +1,66 @@
+"""CLIのリロード（インポートキャッシュの破棄からターゲットの再インポートまで）の遅延を計測する。
+
+    python benchmarks/bench_reload.py [modules]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def make_app(root: str, modules: int):
+    # Reloader がキャッシュを破棄するのは、ターゲットのモジュールとその属性の定義元のモジュール
+    imports = []
+    for i in range(modules):
+        with open(os.path.join(root, f"bench_reload_mod{i}.py"), "w") as f:
+            f.write("import json\n\nVALUES = [json.dumps(x) for x in range(1000)]\n")
+            f.write(f"\n\ndef work{i}():\n    return VALUES\n")
+        imports.append(f"from bench_reload_mod{i} import work{i}")
+
+    with open(os.path.join(root, "bench_reload_app.py"), "w") as f:
+        f.write("\n".join(imports))
+        f.write("\n\n\nasync def main(token):\n    ...\n")
+
+
+def bench_reload(modules: int, repeat: int = 5):
+    from asy.cli import Reloader
+
+    names = [f"bench_reload_mod{i}" for i in range(modules)]
+
+    with tempfile.TemporaryDirectory() as root:
+        make_app(root, modules)
+        sys.path.insert(0, root)
+        sys.dont_write_bytecode = True
+        try:
+            reloader = Reloader.from_functions("bench_reload_app:main")
+            elapsed = []
+            for _ in range(repeat):
+                before = [sys.modules[x] for x in names]
+                start = time.perf_counter()
+                reloader.clear_import()
+                reloader.resolve()
+                elapsed.append(time.perf_counter() - start)
+                # 依存するモジュールまで再実行されていなければ、計測に意味がない
+                after = [sys.modules[x] for x in names]
+                assert all(x is not y for x, y in zip(before, after))
+        finally:
+            sys.path.remove(root)
+            for name in ["bench_reload_app", *names]:
+                sys.modules.pop(name, None)
+
+    return {
+        "name": "reload.latency",
+        "count": modules,
+        "seconds": min(elapsed),
+    }
+
+
+def main(count: int = 50):
+    return [bench_reload(count)]
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for result in main(count):
+        print(json.dumps(result))
@@ -0,0 +1,94 @@
+"""Resultの保持方針ごとに、子タスクの完了数に対するメモリ使用量（RSS）を計測する。
+
+    python benchmarks/bench_results.py [completions]
+"""
+import asyncio
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+import asy
+from asy.results import Results, Retention
+
+WIDTH = 1000
+
+
+def job():
+    return None
+
+
+def get_rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+def bench_retention(name, retention, completions: int):
+    rounds = completions // WIDTH
+    count = 0
+    rss = {}
+
+    def periodic():
+        nonlocal count
+        count += 1
+        if count in (rounds // 10, rounds):
+            rss[count] = get_rss()
+        if count < rounds:
+            raise asy.RestartAllException()
+
+    supervisor = asy.supervise(periodic, *[job] * (WIDTH - 1))
+    supervisor.set_config(retention=retention)
+
+    start = time.perf_counter()
+    supervisor.run(handle_signals=set())
+    elapsed = time.perf_counter() - start
+
+    first, last = rss[rounds // 10], rss[rounds]
+    return {
+        "name": f"retention.{name}",
+        "completions": rounds * WIDTH,
+        "seconds": elapsed,
+        "rss_after_10_percent": first,
+        "rss_at_end": last,
+        "rss_growth": last - first,
+    }
+
+
+def bench_from_tasks(count: int):
+    async def main():
+        tasks = [asyncio.create_task(asyncio.sleep(0, "x" * 10)) for _ in range(count)]
+        await asyncio.wait(tasks)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        results = Results.from_tasks(tasks)
+        elapsed = time.perf_counter() - start
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(results) == count
+        return elapsed, allocated
+
+    elapsed, allocated = asyncio.run(main())
+    return {
+        "name": "results.from_tasks",
+        "count": count,
+        "seconds": elapsed,
+        "bytes_per_result": allocated / count,
+    }
+
+
+def main(completions: int = 1_000_000):
+    return [
+        bench_from_tasks(completions // 10),
+        bench_retention("last_round", Retention(), completions),
+        bench_retention("maxlen", Retention(maxlen=1000), completions),
+        bench_retention("failures_only", Retention(failures_only=True), completions),
+        bench_retention("keep_all", Retention(across_restarts=True), completions),
+    ]
+
+
+if __name__ == "__main__":
+    completions = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for result in main(completions):
+        print(json.dumps(result))
@@ -0,0 +1,71 @@
+"""子タスクのスケジューリング経路の割り当て量とスループットを計測する。
+
+    python benchmarks/bench_schedule.py [count]
+"""
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+
+import asy
+from asy.normalizer import normalize_to_schedulable
+
+
+async def cancelable_child(token):
+    return None
+
+
+async def force_cancel_child():
+    return None
+
+
+def bench_throughput(func, count: int, eager: bool = False):
+    supervisor = asy.supervise(*[func] * count)
+
+    start = time.perf_counter()
+    supervisor.run(handle_signals=set(), eager=eager)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "name": f"throughput.{func.__name__}{'.eager' if eager else ''}",
+        "count": count,
+        "seconds": elapsed,
+        "children_per_second": count / elapsed,
+    }
+
+
+def bench_allocation(func, count: int):
+    schedulable = normalize_to_schedulable(func)
+
+    async def main():
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        scheduled = [schedulable.schedule() for _ in range(count)]
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        await asyncio.gather(*(task for token, task in scheduled))
+        return after - before
+
+    allocated = asyncio.run(main())
+    return {
+        "name": f"allocation.{func.__name__}",
+        "count": count,
+        "bytes_per_child": allocated / count,
+    }
+
+
+def main(count: int = 100_000):
+    results = []
+    for func in (cancelable_child, force_cancel_child):
+        results.append(bench_allocation(func, count))
+        results.append(bench_throughput(func, count))
+        if hasattr(asyncio, "eager_task_factory"):
+            results.append(bench_throughput(func, count, eager=True))
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for result in main(count):
+        print(json.dumps(result))
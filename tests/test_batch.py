@@ -0,0 +1,115 @@
+import asyncio
+import functools
+import operator
+
+import pytest
+
+import asy
+
+
+def run(batch):
+    async def main():
+        return await batch
+
+    return asyncio.run(main())
+
+
+def test_map_ordered():
+    async def double(item):
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 2
+
+    result = run(asy.supervise.map(double, range(5), concurrency=5))
+    assert result == [0, 2, 4, 6, 8]
+
+
+def test_map_completion_order():
+    async def double(item):
+        await asyncio.sleep(0.01 * (5 - item))
+        return item * 2
+
+    batch = asy.supervise.map(double, range(5), concurrency=5, ordered=False)
+    assert run(batch) == [8, 6, 4, 2, 0]
+
+
+def test_map_concurrency_and_lazy_input():
+    consumed = 0
+    in_flight = 0
+    max_in_flight = 0
+    tokens = set()
+
+    def items():
+        nonlocal consumed
+        for i in range(100):
+            consumed += 1
+            yield i
+
+    async def job(item, token):
+        nonlocal in_flight, max_in_flight
+        tokens.add(id(token))
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return item
+
+    result = asy.supervise(asy.supervise.map(job, items(), concurrency=3)).run()
+
+    (succeed,) = result.groups["succeed"]
+    assert succeed["result"] == list(range(100))
+    assert consumed == 100
+    assert max_in_flight == 3
+    assert len(tokens) == 1
+
+
+def test_map_sync_func():
+    result = run(asy.supervise.map(lambda x: x + 1, range(3)))
+    assert result == [1, 2, 3]
+
+
+def test_map_error():
+    async def fail(item):
+        if item == 3:
+            raise ValueError("fail")
+        return item
+
+    with pytest.raises(ValueError, match="fail"):
+        run(asy.supervise.map(fail, range(10), concurrency=2))
+
+
+def test_map_bound_method():
+    class Doubler:
+        async def double(self, item):
+            return item * 2
+
+        def triple(self, item, token):
+            return item * 3
+
+    assert run(asy.supervise.map(Doubler().double, range(3))) == [0, 2, 4]
+    assert run(asy.supervise.map(Doubler().triple, range(3))) == [0, 3, 6]
+
+
+def test_map_partial():
+    async def add(n, item):
+        return n + item
+
+    triple = functools.partial(operator.mul, 3)
+    assert run(asy.supervise.map(triple, range(3))) == [0, 3, 6]
+    assert run(asy.supervise.map(functools.partial(add, 10), range(3))) == [10, 11, 12]
+
+
+def test_map_rerun():
+    def double(item):
+        return item * 2
+
+    batch = asy.supervise.map(double, range(3))
+    assert run(batch) == run(batch) == [0, 2, 4]
+
+    # 関数を渡すと、実行毎にイテレータを作り直す
+    batch = asy.supervise.map(double, lambda: iter(range(3)))
+    assert run(batch) == run(batch) == [0, 2, 4]
+
+    batch = asy.supervise.map(double, iter(range(3)))
+    assert run(batch) == [0, 2, 4]
+    with pytest.raises(RuntimeError):
+        run(batch)
@@ -0,0 +1,97 @@
+import asyncio
+import copy
+import time
+
+import asy
+
+
+def test_budget_cancels_spinning_child():
+    async def spin(token):
+        while not token.is_cancelled:
+            time.sleep(0.01)
+            await asyncio.sleep(0)
+        return "stopped"
+
+    async def polite(token):
+        while not token.is_cancelled:
+            await asyncio.sleep(0.01)
+        return "done"
+
+    supervisor = asy.supervise(spin, polite, asy.timeout(1))
+    supervisor.set_config(budget=asy.Budget(cpu=0.5, interval=0.2))
+    results = supervisor.run(handle_signals=set())
+
+    # 超過した子タスクのみがキャンセルされる
+    assert results[0]["result"] == "stopped"
+    assert "done" in [x["result"] for x in results[1:]]
+    assert [x["exceeded"] for x in supervisor.metrics.budgets.values()] == ["cpu"]
+
+
+def test_budget_restarts_leaking_child():
+    leaked = []
+    rounds = 0
+
+    async def leak(token):
+        nonlocal rounds
+        rounds += 1
+        if rounds > 1:
+            raise asy.AllCancelException()
+        while not token.is_cancelled:
+            leaked.append(bytearray(1024 * 1024))
+            await asyncio.sleep(0.01)
+        leaked.clear()
+
+    supervisor = asy.supervise(leak)
+    supervisor.set_config(
+        budget=asy.Budget(memory=5 * 1024 * 1024, interval=0.1, restart=True)
+    )
+    supervisor.run(handle_signals=set())
+
+    assert rounds == 2
+    assert supervisor.metrics.restarts == 1
+    assert list(supervisor.metrics.budgets.values())[0]["exceeded"] == "memory"
+
+
+def test_budget_memory_per_child():
+    leaked = []
+    chunk = bytearray(1024 * 1024)
+
+    async def leak(token):
+        while not token.is_cancelled:
+            # ライブラリ内で確保したメモリも、呼び出し元の子タスクに割り当てる
+            leaked.append(copy.deepcopy(chunk))
+            await asyncio.sleep(0.01)
+        return "stopped"
+
+    async def polite(token):
+        while not token.is_cancelled:
+            await asyncio.sleep(0.01)
+        return "done"
+
+    supervisor = asy.supervise(leak, polite, asy.timeout(1))
+    supervisor.set_config(budget=asy.Budget(memory=5 * 1024 * 1024, interval=0.1))
+    results = supervisor.run(handle_signals=set())
+    leaked.clear()
+
+    # 同じモジュールに定義された子タスクでも、確保していない子タスクはキャンセルしない
+    budgets = list(supervisor.metrics.budgets.values())
+    assert [x["name"].rsplit("-", 1)[0].split(".")[-1] for x in budgets] == ["leak"]
+    assert {x["result"] for x in results} == {"stopped", "done", None}
+
+
+def test_budget_memory_ambiguous():
+    leaked = []
+
+    async def leak(token):
+        while not token.is_cancelled:
+            leaked.append(bytearray(1024 * 1024))
+            await asyncio.sleep(0.01)
+        return "stopped"
+
+    supervisor = asy.supervise(leak, leak, asy.timeout(0.5))
+    supervisor.set_config(budget=asy.Budget(memory=5 * 1024 * 1024, interval=0.1))
+    supervisor.run(handle_signals=set())
+    leaked.clear()
+
+    # 同じ関数の子タスクはどちらが確保したか区別できないため、キャンセルしない
+    assert supervisor.metrics.budgets == {}
@@ -0,0 +1,139 @@
+import asyncio
+import sys
+
+import pytest
+
+import asy
+
+typer = pytest.importorskip("typer")
+
+from asy.cli import Reloader  # noqa: E402
+
+WORKER = """
+import asyncio
+
+VERSION = {version}
+
+async def work(token):
+    with open({log!r}, "a") as f:
+        f.write(f"start {{VERSION}}\\n")
+    while not token.is_cancelled:
+        await asyncio.sleep(0.01)
+    with open({log!r}, "a") as f:
+        f.write(f"stop {{VERSION}}\\n")
+"""
+
+
+def test_rolling_reload(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    module = tmp_path / "rolling_worker.py"
+    log = tmp_path / "log.txt"
+    module.write_text(WORKER.format(version=1, log=str(log)))
+
+    reloader = Reloader(
+        ["rolling_worker:work"],
+        rolling=True,
+        reload_dirs=[str(tmp_path)],
+        interval=0.1,
+        health_grace=0.1,
+    )
+
+    async def update():
+        await asyncio.sleep(0.5)
+        module.write_text(WORKER.format(version=2, log=str(log)))
+        await asyncio.sleep(0.5)
+        # インポートに失敗する変更は無視され、稼働中の世代が維持される
+        module.write_text("raise Exception()")
+
+    asy.supervise(reloader, update, asy.timeout(1.5)).run(handle_signals=set())
+
+    assert log.read_text().splitlines() == ["start 1", "start 2", "stop 1", "stop 2"]
+
+
+WARMUP_WORKER = """
+import asyncio
+
+with open({log!r}, "a") as f:
+    f.write("import {name}\\n")
+
+async def work(token):
+    with open({log!r}, "a") as f:
+        f.write("start {name}\\n")
+
+async def warmup():
+    await asyncio.sleep(0.01)
+    with open({log!r}, "a") as f:
+        f.write("warmup {name}\\n")
+
+work.__asy_warmup__ = warmup
+"""
+
+
+def test_resolve_once_and_warmup(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    log = tmp_path / "log.txt"
+    for name in ("warmup_a", "warmup_b"):
+        module = tmp_path / f"{name}.py"
+        module.write_text(WARMUP_WORKER.format(name=name, log=str(log)))
+
+    reloader = Reloader(["warmup_a:work", "warmup_b:work"])
+    asy.supervise(reloader).run(handle_signals=set())
+
+    lines = log.read_text().splitlines()
+    # モジュールは一度だけインポートされ、ウォームアップは子タスクの開始前に完了する
+    assert sorted(lines[:2]) == ["import warmup_a", "import warmup_b"]
+    assert sorted(lines[2:4]) == ["warmup warmup_a", "warmup warmup_b"]
+    assert sorted(lines[4:]) == ["start warmup_a", "start warmup_b"]
+
+
+def test_resolve_main_thread_only_module(tmp_path, monkeypatch):
+    from asy.cli import resolve_attrs
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "signal_a.py").write_text(
+        "import signal\n\nsignal.signal(signal.SIGUSR1, signal.SIG_DFL)\nA = 1\n"
+    )
+    (tmp_path / "signal_b.py").write_text("B = 2\n")
+
+    try:
+        # スレッドでのインポートに失敗したモジュールは、メインスレッドで改めてインポートする
+        assert resolve_attrs(["signal_a:A", "signal_b:B"]) == [1, 2]
+    finally:
+        sys.modules.pop("signal_a", None)
+        sys.modules.pop("signal_b", None)
+
+
+BLOCKING_WORKER = """
+import asyncio
+import time
+
+async def work(token):
+    while not token.is_cancelled:
+        time.sleep(0.02)
+        await asyncio.sleep(0.01)
+"""
+
+
+def test_reloader_metrics_across_generations(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "blocking_worker.py").write_text(BLOCKING_WORKER)
+
+    reloader = Reloader(
+        ["blocking_worker:work"],
+        watchdog=asy.Watchdog(interval=0.01, threshold=0.0),
+    )
+    snapshots = []
+
+    async def reload():
+        # FileWatcher と同様に、ファイルの変更を検知したものとして再起動する
+        await asyncio.sleep(0.2)
+        snapshots.append(reloader.metrics.snapshot())
+        if len(snapshots) < 3:
+            raise asy.RestartAllException()
+        raise asy.AllCancelException()
+
+    asy.supervise(reloader, reload).run(handle_signals=set())
+
+    assert [x["restarts"] for x in snapshots] == [0, 1, 2]
+    assert all(x["max_loop_lag"] > 0 for x in snapshots)
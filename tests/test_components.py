@@ -1,5 +1,13 @@
+import json
+import signal
+import sys
+import threading
+
+import pytest
+
 import asy
-from asy.components import FileWatcher
+from asy.components import FileWatcher, HealthServer, StateStore, Subprocess
+from asy.components import MicroWorkers, memoize
 from asy.components.filewatcher import iter_py_files
 import asyncio
 
@@ -39,3 +47,302 @@ def test_reloader(tmp_path):
 
     assert result
     assert count == 2
+
+
+def test_state_store(tmp_path):
+    path = tmp_path / "worker.state"
+
+    def make_ingest(store):
+        async def ingest(token):
+            for i in range(store.get("cursor", 0), 10):
+                store["cursor"] = i + 1
+                if i == 4:
+                    raise asy.AllCancelException()
+                await asyncio.sleep(0)
+
+        return ingest
+
+    store = StateStore(path, interval=0.05)
+    asy.supervise(make_ingest(store), store).run()
+    assert StateStore(path)["cursor"] == 5
+
+    # プロセスの再起動を想定し、新たなストアで前回の続きから再開する
+    store = StateStore(path, interval=0.05)
+    asy.supervise(make_ingest(store), asy.timeout(0.2), store).run()
+    assert StateStore(path)["cursor"] == 10
+
+
+def test_state_store_writes_in_executor(tmp_path):
+    threads = []
+
+    class Store(StateStore):
+        def write(self, payload):
+            threads.append(threading.get_ident())
+            super().write(payload)
+
+    store = Store(tmp_path / "worker.state", interval=0.05)
+
+    async def update(token):
+        store["cursor"] = 1
+
+    asy.supervise(update, asy.timeout(0.1), store).run()
+
+    assert threads
+    assert threading.get_ident() not in threads
+    assert StateStore(tmp_path / "worker.state")["cursor"] == 1
+
+
+def test_subprocess_stream_lines():
+    lines = []
+    proc = Subprocess(
+        sys.executable, "-c", "print('hello'); print('world')", on_stdout=lines.append
+    )
+    result = asy.supervise(proc).run(handle_signals=set())
+
+    assert result.groups["succeed"][0]["result"] == 0
+    assert lines == ["hello", "world"]
+
+
+def test_subprocess_exit_error():
+    proc = Subprocess(sys.executable, "-c", "import sys; sys.exit(3)")
+    result = asy.supervise(proc).run(handle_signals=set())
+
+    (failed,) = result.groups["failed"]
+    assert "exited with code 3" in failed["exception"]
+
+
+@pytest.mark.parametrize(
+    "code, returncode",
+    [
+        ("import time; time.sleep(10)", -signal.SIGTERM),
+        (
+            "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN);"
+            "print('ready', flush=True); time.sleep(10)",
+            -signal.SIGKILL,
+        ),
+    ],
+)
+def test_subprocess_cancel(code, returncode):
+    proc = Subprocess(sys.executable, "-c", code, grace=0.2)
+    result = asy.supervise(proc, asy.timeout(0.3)).run(handle_signals=set())
+
+    assert result.groups["succeed"][0]["result"] == returncode
+
+
+def test_health_server(tmp_path):
+    path = str(tmp_path / "health.sock")
+    responses = {}
+
+    async def worker(token):
+        while not token.is_cancelled:
+            await asyncio.sleep(0.01)
+
+    supervisor = asy.supervise(worker)
+
+    async def request(target):
+        reader, writer = await asyncio.open_unix_connection(path)
+        writer.write(f"GET {target} HTTP/1.0\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response
+
+    async def probe():
+        await asyncio.sleep(0.2)
+        for target in ("/health", "/ready", "/unknown"):
+            responses[target] = await request(target)
+        raise asy.AllCancelException()
+
+    async def main():
+        await supervisor.start()
+        await asy.supervise(HealthServer(supervisor, path=path), probe)(
+            asy.CancelToken()
+        )
+        await supervisor.stop()
+
+    asyncio.run(main())
+
+    head, body = responses["/health"].split(b"\r\n\r\n", 1)
+    assert head.startswith(b"HTTP/1.0 200")
+    assert json.loads(body)["running"] == 1
+    assert responses["/ready"].startswith(b"HTTP/1.0 200")
+    assert responses["/unknown"].startswith(b"HTTP/1.0 404")
+
+
+def test_memoize_coalesces_calls():
+    calls = []
+
+    @memoize(maxsize=2)
+    async def lookup(key):
+        calls.append(key)
+        await asyncio.sleep(0.05)
+        return key * 2
+
+    async def main():
+        values = await asyncio.gather(*(lookup(1) for _ in range(10)))
+        assert values == [2] * 10
+        assert await lookup(1) == 2
+        await lookup(2)
+        await lookup(3)
+        # 最も古く参照された 1 が追い出される
+        assert await lookup(1) == 2
+
+    asyncio.run(main())
+    assert calls == [1, 2, 3, 1]
+    assert lookup.cache_info()["size"] == 2
+
+
+def test_memoize_ttl_and_errors():
+    calls = 0
+
+    @memoize(ttl=0.05)
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise ValueError()
+        return calls
+
+    async def main():
+        with pytest.raises(ValueError):
+            await lookup()
+        assert await lookup() == 2
+        assert await lookup() == 2
+        await asyncio.sleep(0.1)
+        assert await lookup() == 3
+
+    asyncio.run(main())
+
+
+def test_memoize_method():
+    calls = []
+
+    class Repository:
+        def __init__(self, prefix):
+            self.prefix = prefix
+
+        @memoize()
+        async def lookup(self, key):
+            calls.append((self.prefix, key))
+            return f"{self.prefix}{key}"
+
+    async def main():
+        a, b = Repository("a"), Repository("b")
+        assert await a.lookup(1) == "a1"
+        assert await a.lookup(1) == "a1"
+        # インスタンス毎に別の結果として保持する
+        assert await b.lookup(1) == "b1"
+        assert await b.lookup.call(asy.CancelToken(), 1) == "b1"
+
+    asyncio.run(main())
+    assert calls == [("a", 1), ("b", 1)]
+    assert Repository.lookup.cache_info()["size"] == 2
+
+
+def test_memoize_cancel_does_not_cancel_others():
+    @memoize()
+    async def lookup():
+        await asyncio.sleep(0.2)
+        return "value"
+
+    async def main():
+        token = asy.CancelToken()
+        first = asyncio.create_task(lookup.call(token))
+        second = asyncio.create_task(lookup())
+        third = asyncio.create_task(lookup())
+        await asyncio.sleep(0.01)
+
+        token.is_cancelled = True
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        assert await second == "value"
+
+    asyncio.run(main())
+
+
+def test_micro_workers():
+    counts = [0] * 1000
+
+    def counter(i):
+        while counts[i] < 3:
+            counts[i] += 1
+            yield
+
+    steps = 0
+
+    def step():
+        nonlocal steps
+        steps += 1
+        if steps == 2:
+            raise ValueError()
+        return steps < 5
+
+    workers = [counter(i) for i in range(1000)] + [step, step]
+    micro = MicroWorkers(workers, drivers=3, yield_every=100)
+    result = asy.run(micro)
+
+    assert counts == [3] * 1000
+    assert result[0]["result"] == {"finished": 1001, "failed": 1, "remaining": 0}
+    assert isinstance(micro.errors[0], ValueError)
+
+
+def test_micro_workers_generator_yields_false():
+    counts = [0] * 10
+
+    def counter(i):
+        while counts[i] < 3:
+            counts[i] += 1
+            yield False
+
+    micro = MicroWorkers([counter(i) for i in range(10)], drivers=2)
+    result = asy.run(micro)
+
+    assert counts == [3] * 10
+    assert result[0]["result"] == {"finished": 10, "failed": 0, "remaining": 0}
+
+
+def test_micro_workers_cancel():
+    closed = 0
+
+    def forever():
+        nonlocal closed
+        try:
+            while True:
+                yield
+        finally:
+            closed += 1
+
+    micro = MicroWorkers([forever() for _ in range(100)], interval=0.01)
+    result = asy.run(micro, asy.timeout(0.1))
+
+    expected = {"finished": 0, "failed": 0, "remaining": 100}
+    assert result.groups["succeed"][0]["result"] == expected
+    assert closed == 100
+
+
+def test_micro_workers_restart():
+    rounds = 0
+
+    async def restart_once():
+        nonlocal rounds
+        rounds += 1
+        await asyncio.sleep(0.05)
+        if rounds == 1:
+            raise asy.RestartAllException()
+
+    def counter():
+        for _ in range(3):
+            yield
+
+    # 関数を渡すと、ラウンド毎にワーカーを作り直す
+    micro = MicroWorkers(lambda: [counter() for _ in range(10)])
+    result = asy.supervise(micro, restart_once).run(handle_signals=set())
+    expected = {"finished": 10, "failed": 0, "remaining": 0}
+    assert [x["result"] for x in result.groups["succeed"] if x["result"]] == [expected]
+
+    rounds = 0
+    micro = MicroWorkers([counter() for _ in range(10)])
+    result = asy.supervise(micro, restart_once).run(handle_signals=set())
+    assert result.groups["failed"][0]["exception"].startswith("RuntimeError")
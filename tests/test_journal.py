@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+import asy
+from asy.journal import iter_journal
+
+
+async def succeed(token):
+    return 1
+
+
+async def fail(token):
+    raise ValueError("boom")
+
+
+async def forever(token):
+    while not token.is_cancelled:
+        await asyncio.sleep(0.01)
+
+
+def test_journal_records_lifecycle(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = asy.Journal(path)
+
+    supervisor = asy.supervise(succeed, fail, forever)
+    supervisor.set_config(journal=journal)
+
+    async def main():
+        token = asy.CancelToken()
+        task = asyncio.create_task(supervisor(token))
+        await asyncio.sleep(0.05)
+        token.is_cancelled = True
+        await task
+
+    asyncio.run(main())
+    journal.flush()
+
+    events = [x["event"] for x in iter_journal(path)]
+    assert events.count("start") == 3
+    assert events.count("finish") == 3
+    assert "cancel" in events
+
+    results = asy.read_journal(path)
+    assert len(results) == 3
+    assert {x["state"] for x in results} == {"succeed", "failed"}
+    assert all(x["duration"] >= 0 and x["restarts"] == 0 for x in results)
+    assert [x["exception"] for x in results if x["state"] == "failed"] == [
+        "ValueError('boom')"
+    ]
+    journal.close()
+
+
+def test_read_journal_marks_unfinished_as_pending(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = asy.Journal(path)
+    journal.record("start", "a", 1)
+    journal.record("start", "b", 2)
+    journal.record("finish", "a", 1, "succeed")
+    journal.close()
+
+    results = asy.read_journal(path)
+    assert [(x["name"], x["state"]) for x in results] == [
+        ("a", "succeed"),
+        ("b", "pending"),
+    ]
+
+
+def test_journal_bad_path(tmp_path):
+    with pytest.raises(OSError):
+        asy.Journal(tmp_path / "missing" / "journal.jsonl")
+
+
+def test_read_journal_separates_runs(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    crashed = asy.Journal(path)
+    crashed.record("start", "a", 1)
+    crashed.close()
+    # 書き込みスレッドが終了していても待ち続けない
+    assert not crashed.flush()
+
+    # 前回の実行と同じidが再利用されても、前回の開始とは対応付けない
+    journal = asy.Journal(path)
+    journal.record("start", "b", 1)
+    journal.record("finish", "b", 1, "succeed")
+    journal.close()
+
+    results = asy.read_journal(path)
+    assert [(x["name"], x["state"]) for x in results] == [
+        ("b", "succeed"),
+        ("a", "pending"),
+    ]
+
+
+def test_reloader_journal(tmp_path, monkeypatch):
+    pytest.importorskip("typer")
+    from asy.cli import Reloader
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "journal_jobs.py").write_text("async def job(token):\n    return 1\n")
+    path = tmp_path / "journal.jsonl"
+    journal = asy.Journal(path)
+
+    reloader = Reloader(["journal_jobs:job"], journal=journal)
+    asy.supervise(reloader).run(handle_signals=set())
+    journal.close()
+
+    # 外側のスーパーバイザーではなく、利用者の子タスクが記録される
+    assert [x["name"].rsplit("-", 1)[0] for x in asy.read_journal(path)] == ["job"]
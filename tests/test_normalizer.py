@@ -3,6 +3,7 @@ from asy.normalizer import normalize_to_schedulable
 from typing import Any
 from asy import PCancelToken, CancelToken
 from asy.schedulable import ForceCancelAsyncTask, CancelableAsyncTask
+from asy.schedulable import ForceCancelAsyncStream, CancelableAsyncStream
 import asyncio
 
 
@@ -104,8 +105,23 @@ class CallableLazy:
         return 1
 
 
+async def stream_no_args():
+    yield 1
+
+
+async def stream_one_args(token):
+    yield 1
+
+
+class CallableStream:
+    async def __call__(self, token):
+        yield 1
+
+
 CANCELABLE = CancelableAsyncTask
 FORCE_CANCEL = ForceCancelAsyncTask
+CANCELABLE_STREAM = CancelableAsyncStream
+FORCE_CANCEL_STREAM = ForceCancelAsyncStream
 ERROR = None
 
 
@@ -132,6 +148,9 @@ ERROR = None
         (ERROR, CallableOneArgNormal()),
         (CANCELABLE, one_args_pcancel_token_lazy),
         (CANCELABLE, CallableLazy()),
+        (FORCE_CANCEL_STREAM, stream_no_args),
+        (CANCELABLE_STREAM, stream_one_args),
+        (CANCELABLE_STREAM, CallableStream()),
     ],
 )
 def test_normalize_to_task(expect_type, value):
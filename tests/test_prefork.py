@@ -0,0 +1,33 @@
+import os
+
+from asy.prefork import Prefork
+
+
+def test_prefork(tmp_path):
+    parent = os.getpid()
+
+    def worker():
+        assert os.getpid() != parent
+        (tmp_path / str(os.getpid())).write_text("")
+
+    exitcodes = Prefork([worker], workers=3, preload=True).run(handle_signals=set())
+
+    assert exitcodes == [0, 0, 0]
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_prefork_respawn(tmp_path):
+    marker = tmp_path / "crashed"
+
+    def crash_once():
+        try:
+            fd = os.open(marker, os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            return
+        os.close(fd)
+        os._exit(3)
+
+    prefork = Prefork([crash_once], workers=2, preload=True, respawn_delay=0)
+    exitcodes = prefork.run(handle_signals=set())
+
+    assert sorted(exitcodes) == [0, 0, 3]
@@ -0,0 +1,177 @@
+import asyncio
+import csv
+import gc
+import io
+import tracemalloc
+
+import asy
+from asy.columns import ColumnWriter, read_columns
+from asy.results import Result, Results, Retention
+
+
+def job():
+    return "x" * 100
+
+
+def fail():
+    raise ValueError("fail")
+
+
+def run_rounds(retention, rounds, width, on_round=None):
+    count = 0
+
+    def periodic():
+        nonlocal count
+        count += 1
+        if on_round:
+            on_round(count)
+        if count < rounds:
+            raise asy.RestartAllException()
+
+    supervisor = asy.supervise(periodic, fail, *[job] * width)
+    supervisor.set_config(retention=retention)
+    return supervisor.run(handle_signals=set())
+
+
+def test_retention_default_last_round():
+    result = run_rounds(Retention(), rounds=200, width=2)
+    assert isinstance(result, Results)
+    # 再起動を跨いで蓄積せず、最後のラウンドのみを返す
+    assert len(result) == 4
+
+
+def test_retention_across_restarts():
+    result = run_rounds(Retention(across_restarts=True), rounds=3, width=2)
+    assert len(result) == 3 * 4
+    # RestartAllExceptionで終了したタスクも含む
+    assert len(result.groups["failed"]) == 3 + 2
+
+
+def test_retention_maxlen():
+    result = run_rounds(Retention(maxlen=5, across_restarts=True), rounds=3, width=2)
+    assert len(result) == 5
+
+
+def test_retention_failures_only():
+    retention = Retention(failures_only=True, across_restarts=True)
+    result = run_rounds(retention, rounds=3, width=2)
+    assert len(result) == 5
+    assert all(x["state"] == "failed" for x in result)
+
+
+def test_retention_drop_payloads():
+    result = run_rounds(Retention(drop_payloads=True), rounds=1, width=2)
+    assert len(result.groups["succeed"]) == 3
+    assert all(x["result"] is None for x in result)
+
+
+def test_retention_bounds_memory():
+    rounds, width = 40, 500
+    usage = {}
+
+    def on_round(count):
+        if count in (10, rounds):
+            gc.collect()
+            usage[count] = tracemalloc.get_traced_memory()[0]
+
+    tracemalloc.start()
+    try:
+        retention = Retention(maxlen=100, drop_payloads=True, across_restarts=True)
+        run_rounds(retention, rounds, width, on_round)
+    finally:
+        tracemalloc.stop()
+
+    # 30ラウンド・15000件の完了を経てもメモリが増加しない
+    assert usage[rounds] - usage[10] < 10_000
+
+
+def make_results():
+    tasks = []
+    for i in range(10):
+        state = "failed" if i % 5 == 0 else "succeed"
+        exception = "ValueError('fail\\n')" if state == "failed" else None
+        tasks.append(
+            Result(
+                name=f"job{i}",
+                state=state,
+                coro="job",
+                exception=exception,
+                result=i,
+                started=0.0,
+                ended=float(i),
+                duration=float(i),
+                restarts=0,
+            )
+        )
+    return Results(tuple(tasks))
+
+
+def test_results_columns():
+    results = make_results()
+    columns = results.columns()
+
+    assert columns["name"][:2] == ["job0", "job1"]
+    assert columns["state"].tolist()[:2] == [1, 0]
+    counts = results.counts()
+    assert counts == {"succeed": 8, "failed": 2, "cancelled": 0, "pending": 0}
+    assert results.failure_rate() == 0.2
+
+    f = io.StringIO()
+    results.to_csv(f)
+    rows = list(csv.reader(io.StringIO(f.getvalue())))
+    assert rows[0] == ["name", "state", "exception", "started", "duration", "restarts"]
+    assert rows[1] == ["job0", "failed", "ValueError('fail\\n')", "0.0", "0.0", "0"]
+    assert len(rows) == 11
+
+
+def test_column_writer(tmp_path):
+    results = make_results()
+    results.to_columns(tmp_path, batch_size=3)
+    columns = read_columns(tmp_path)
+
+    assert columns["name"] == results.columns()["name"]
+    assert columns["state"] == results.columns()["state"]
+    assert columns["exception"] == results.columns()["exception"]
+    assert columns["duration"] == results.columns()["duration"]
+
+    writer = ColumnWriter(tmp_path / "stream")
+    supervisor = asy.supervise(job, fail)
+    supervisor.set_config(on_completed=writer.write_task)
+    supervisor.run(handle_signals=set())
+    writer.close()
+
+    columns = read_columns(tmp_path / "stream")
+    assert sorted(columns["state"].tolist()) == [0, 1]
+
+    # 保持せずに、時刻を含めて書き出す
+    with ColumnWriter(tmp_path / "sink") as writer:
+        supervisor.set_config(retention=Retention(maxlen=0, sink=writer.write))
+        assert len(supervisor.run(handle_signals=set())) == 0
+
+    columns = read_columns(tmp_path / "sink")
+    assert len(columns["duration"]) == 2
+    assert all(x > 0 for x in columns["started"])
+
+
+def test_results_timing():
+    results = make_results()
+    assert results.percentiles(0, 50, 100) == {0: 0.0, 50: 4.5, 100: 9.0}
+    assert [x["name"] for x in results.slowest(2)] == ["job9", "job8"]
+
+    async def slow():
+        await asyncio.sleep(0.05)
+
+    rounds = 0
+
+    def restart():
+        nonlocal rounds
+        rounds += 1
+        if rounds == 1:
+            raise asy.RestartAllException()
+
+    supervisor = asy.supervise(slow, restart)
+    supervisor.set_config(retention=Retention(across_restarts=True))
+    results = supervisor.run(handle_signals=set())
+    timing = {(x["coro"], x["restarts"]): x["duration"] for x in results}
+    assert timing[("test_results_timing.<locals>.slow", 1)] >= 0.05
+    assert timing[("test_results_timing.<locals>.restart", 0)] < 0.05
@@ -269,3 +269,225 @@ def test_run_in_event_loop():
 
     with pytest.raises(RuntimeError, match="Can not run in event loop."):
         asyncio.run(main())
+
+
+def test_watchdog_detects_stall():
+    stalls = []
+
+    async def stuck(token):
+        token.heartbeat()
+        while not token.is_cancelled:
+            await asyncio.sleep(0.01)
+
+    snapshots = []
+
+    async def inspect():
+        await asyncio.sleep(0.4)
+        snapshots.append(supervisor.metrics.snapshot()["stalls"])
+
+    supervisor = asy.supervise(stuck, stuck, stuck, inspect, asy.timeout(0.5))
+    supervisor.set_config(
+        on_stall=lambda task, stall: stalls.append(stall),
+        watchdog=asy.Watchdog(interval=0.05, threshold=0.1),
+    )
+    supervisor.run()
+
+    # 同じ関数から作られた子タスクも、それぞれ停滞として検知される
+    assert len(stalls) == 3
+    assert "stuck" in stalls[0]["stack"]
+    assert len(snapshots[0]) == 3
+
+
+def test_profiler(tmp_path):
+    def busy():
+        end = time.monotonic() + 0.01
+        while time.monotonic() < end:
+            ...
+
+    async def hot_loop(token):
+        while not token.is_cancelled:
+            busy()
+            await asyncio.sleep(0)
+
+    supervisor = asy.supervise(hot_loop, asy.timeout(0.3))
+    supervisor.set_config(profiler=asy.Profiler(tmp_path, interval=0.001))
+    supervisor.run()
+
+    (path,) = tmp_path.glob("*hot_loop.folded")
+    folded = path.read_text().splitlines()
+    assert folded
+    stack, count = folded[0].rsplit(" ", 1)
+    assert "hot_loop" in stack
+    assert int(count) > 0
+
+
+def test_run_eager():
+    async def func(token):
+        return 1
+
+    result = asy.supervise(func, simple_func).run(eager=True)
+    assert len(result) == 2
+
+
+def test_stream_backpressure():
+    produced = 0
+    max_buffered = 0
+
+    async def producer(token):
+        nonlocal produced
+        for i in range(10):
+            produced += 1
+            yield i
+
+    async def main():
+        nonlocal max_buffered
+        supervisor = asy.supervise(producer)
+        supervisor.set_config(channel=asy.Channel(maxsize=2))
+        await supervisor.start()
+
+        items = []
+        async for item in supervisor.channel:
+            max_buffered = max(max_buffered, len(supervisor.channel))
+            items.append(item)
+            await asyncio.sleep(0.01)
+        return items
+
+    assert asyncio.run(main()) == list(range(10))
+    assert produced == 10
+    assert max_buffered <= 2
+
+
+def test_stream_cancel_with_full_channel():
+    async def producer(token):
+        i = 0
+        while not token.is_cancelled:
+            yield i
+            i += 1
+
+    async def main():
+        supervisor = asy.supervise(producer)
+        supervisor.set_config(channel=asy.Channel(maxsize=2))
+        token = asy.CancelToken()
+        task = asyncio.create_task(supervisor(token))
+        await asyncio.sleep(0.05)
+        # 受信側がいないため、送信側は空きを待ち続けている
+        assert len(supervisor.channel) == 2
+        token.is_cancelled = True
+        return await asyncio.wait_for(task, 1)
+
+    result = asyncio.run(main())
+    assert result[0]["state"] == "succeed"
+    assert result[0]["result"] == 2
+
+
+def test_priority():
+    counts = {}
+
+    def make_worker(name):
+        async def worker(token):
+            counts[name] = 0
+            while not token.is_cancelled:
+                busy_until = time.monotonic() + 0.002
+                while time.monotonic() < busy_until:
+                    ...
+                counts[name] += 1
+                await token.yield_if_contended()
+
+        return worker
+
+    high = asy.prioritize(make_worker("high"), asy.Priority.HIGH)
+    lows = [asy.prioritize(make_worker(f"low{i}"), asy.Priority.LOW) for i in range(5)]
+    asy.supervise(high, *lows, asy.timeout(0.5)).run(handle_signals=set())
+
+    assert counts["high"] > 2 * max(counts[f"low{i}"] for i in range(5))
+
+
+def test_circuit_breaker():
+    attempts = 0
+
+    def flaky():
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError()
+
+    breaker = asy.CircuitBreaker(flaky, threshold=3, cooldown=0.2)
+    supervisor = asy.supervise(breaker, asy.timeout(0.5))
+    result = supervisor.run(handle_signals=set())
+
+    # closedで3回、その後cooldown毎にhalf_openで1回ずつ試行する
+    assert 4 <= attempts <= 6
+    assert supervisor.metrics.snapshot()["circuits"][breaker.name] == {
+        "state": "open",
+        "failures": attempts,
+    }
+    failed = [x for x in result.groups["failed"] if x["name"].startswith(breaker.name)]
+    assert "CircuitOpenError" in failed[0]["exception"]
+
+
+def test_circuit_breaker_recover():
+    attempts = 0
+
+    async def recover():
+        nonlocal attempts
+        attempts += 1
+        if attempts < 3:
+            raise ConnectionError()
+        return "ok"
+
+    breaker = asy.CircuitBreaker(recover, threshold=1, cooldown=0.01)
+    result = asy.supervise(breaker).run(handle_signals=set())
+
+    assert breaker.state == "closed"
+    assert result.groups["succeed"][0]["result"] == "ok"
+
+
+def test_cancel_threadsafe():
+    import threading
+
+    async def forever():
+        await asyncio.sleep(60)
+
+    supervisor = asy.supervise(forever)
+    results = []
+
+    def run():
+        results.append(supervisor.run(handle_signals=set()))
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.2)
+    cancelled_at = time.monotonic()
+    supervisor.cancel_threadsafe()
+    thread.join(1)
+    elapsed = time.monotonic() - cancelled_at
+
+    assert not thread.is_alive()
+    assert results[0][0]["state"] == "cancelled"
+    # 0.1秒毎のポーリングを待たずに伝わる
+    assert elapsed < 0.05
+    assert not supervisor.observing
+
+
+def test_cancel_threadsafe_before_start():
+    import threading
+
+    async def forever():
+        await asyncio.sleep(60)
+
+    supervisor = asy.supervise(forever)
+    thread = threading.Thread(target=supervisor.run, args=(set(),))
+    thread.start()
+    # 最初のラウンドが登録される前に呼び出しても取りこぼさない
+    supervisor.cancel_threadsafe()
+    thread.join(1)
+
+    assert not thread.is_alive()
+    assert not supervisor.cancel_pending
+
+
+def test_circuit_breaker_same_function():
+    async def job():
+        return 1
+
+    supervisor = asy.supervise(asy.CircuitBreaker(job), asy.CircuitBreaker(job))
+    assert len(supervisor.metrics.snapshot()["circuits"]) == 2
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import asy
+from asy import testing
+
+
+def test_virtual_time_ordering():
+    order = []
+
+    async def sleeper(seconds):
+        await asyncio.sleep(seconds)
+        order.append(seconds)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(sleeper(x) for x in (3600, 1, 60, 0)))
+        return loop.time()
+
+    started = time.monotonic()
+    assert testing.run(main()) == 3600
+    assert order == [0, 1, 60, 3600]
+    assert time.monotonic() - started < 1
+
+
+def simulate_breaker():
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError()
+
+    breaker = asy.CircuitBreaker(flaky, threshold=3, cooldown=60)
+    supervisor = asy.supervise(breaker, asy.timeout(600))
+    testing.run(supervisor(asy.CancelToken()))
+    return attempts, breaker.state
+
+
+def test_virtual_time_supervisor():
+    started = time.monotonic()
+    # closedで3回、その後60秒毎にhalf_openで1回ずつ試行する
+    assert simulate_breaker() == (13, "open")
+    assert simulate_breaker() == (13, "open")
+    assert time.monotonic() - started < 2
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+import asy
+
+
+def test_run_in_thread_stop():
+    started = threading.Event()
+
+    async def work(token):
+        started.set()
+        while not token.is_cancelled:
+            await asyncio.sleep(0.01)
+        return "stopped"
+
+    handle = asy.supervise(work).run_in_thread()
+    assert started.wait(1)
+    assert handle.is_running
+
+    result = handle.stop(timeout=1)
+    assert result[0]["result"] == "stopped"
+    assert not handle.thread.is_alive()
+    assert handle.loop.is_closed()
+
+
+def test_run_in_thread_result():
+    async def work(token):
+        return 1
+
+    handle = asy.supervise(work).run_in_thread()
+    assert handle.result(timeout=1)[0]["result"] == 1
+    handle.thread.join(1)
+    assert not handle.thread.is_alive()
+
+    # 完了後も再度開始できる
+    handle.start()
+    assert handle.result(timeout=1)[0]["result"] == 1
+
+
+def test_run_in_thread_stop_immediately():
+    async def work():
+        await asyncio.sleep(60)
+
+    handle = asy.SupervisorThread(asy.supervise(work))
+    handle.start()
+    handle.stop(timeout=1)
+    assert not handle.thread.is_alive()
+
+    with pytest.raises(Exception, match="already running"):
+        handle.start()
+        handle.start()
+    handle.stop(timeout=1)
@@ -0,0 +1,40 @@
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+import asy
+from asy import SharedCancelToken
+
+
+def cancelable_worker(token):
+    count = 0
+    while not token.is_cancelled:
+        time.sleep(0.01)
+        count += 1
+    return count
+
+
+def test_shared_cancel_token():
+    token = SharedCancelToken()
+    try:
+        other = pickle.loads(pickle.dumps(token))
+        assert not other.is_cancelled
+        token.is_cancelled = True
+        assert other.is_cancelled
+        other.close()
+    finally:
+        token.close()
+
+    assert token.is_cancelled
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_executor_task(executor_class):
+    with executor_class(max_workers=1) as executor:
+        task = asy.ExecutorTask(cancelable_worker, executor)
+        result = asy.supervise(task, asy.timeout(0.3)).run(handle_signals=set())
+
+    (succeed,) = result.groups["succeed"]
+    assert succeed["result"] > 0